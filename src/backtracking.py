@@ -1,47 +1,322 @@
-import networkx as nx
-from constraint_graph import create_constraint_graph
-from consistent import is_consistent
-from heuristics import order_domain_values_simple, order_domain_values
+import time
 
-def backtracking_search(csp):
+from compiled import compile_puzzle
+from heuristics import order_domain_values_simple
+from instrumentation import profiled, record_duration
+from nogoods import NogoodStore
+from ordering import VariableOrdering
+from propagation import PROPAGATION_MODES, LiveDomains, ac3, propagate
+from state import SearchState
+from utils import export_search_state
+
+STATE_VERSION = 1
+
+def backtracking_search(csp, index=None, propagation="none", tie_break="degree", seed=None,
+                        value_ordering=order_domain_values_simple, stats=None, profile=None,
+                        profile_path=None, **limits):
     """
     Initiate the backtracking search algorithm.
 
+    Thin wrapper around ``search`` returning only the solution.
+
     Args:
         csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary, see
+            ``build_word_index``. Built from the CSP domains when omitted.
+        propagation (str, optional): ``"none"`` for chronological backtracking,
+            ``"forward"`` for forward checking, ``"ac3"`` for forward checking
+            from an arc consistent root, or ``"mac"`` to maintain arc consistency.
+        tie_break (str, optional): Variable ranking, ``"degree"`` (MRV, ties
+            broken by degree) or ``"wdeg"`` (dom/wdeg), see ``VariableOrdering``.
+        seed (int, optional): Seed for breaking the remaining ties randomly.
+        value_ordering (callable, optional): Value ordering with the interface of
+            ``order_domain_values``, e.g. ``order_domain_values_lcv``.
+        stats (dict, optional): Filled with the search ``stats`` (see
+            ``search``), and the hottest functions under ``profile`` when
+            profiling.
+        profile (str, optional): Profile the search with ``"cprofile"`` or
+            ``"sample"``, see ``instrumentation.profiled``.
+        profile_path (str, optional): File the raw cProfile data is dumped to.
+        **limits: ``max_nodes``, ``timeout_s``, ``resume``, ``checkpoint_path``,
+            ``checkpoint_every``, ``puzzle``, ``should_stop``, ``time_nodes``
+            and the backjumping options, see ``search``.
 
     Returns:
         dict or None: The assignment if successful, None otherwise.
     """
-    return recursive_backtracking({}, csp)
+    if stats is None:
+        stats = {}
+    if profile is None:
+        result = search(csp, index, propagation, tie_break, seed, value_ordering, **limits)
+    else:
+        with profiled(stats, profile, profile_path):
+            result = search(csp, index, propagation, tie_break, seed, value_ordering, **limits)
+    stats.update(result["stats"])
+    return result["solution"]
 
-def recursive_backtracking(assignment, csp):
+def search(csp, index=None, propagation="none", tie_break="degree", seed=None,
+           value_ordering=order_domain_values_simple, max_nodes=None, timeout_s=None,
+           resume=None, checkpoint_path=None, checkpoint_every=10000, puzzle=None,
+           should_stop=None, prefix=None, backjumping=False, max_nogoods=10000, time_nodes=False):
     """
-    Recursive function for backtracking search.
+    Iterative backtracking search with an explicit stack.
+
+    The CSP is compiled once into a ``CompiledPuzzle`` so that the loop only
+    reads precomputed neighbor lists and crossings. Each stack frame holds a
+    variable, its ordered values and the position of the value being tried,
+    which is all that is needed to serialize the search and resume it later.
 
     Args:
-        assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary.
+        propagation (str, optional): One of ``PROPAGATION_MODES``.
+        tie_break (str, optional): Variable ranking, ``"degree"`` (MRV, ties
+            broken by degree) or ``"wdeg"`` (dom/wdeg), see ``VariableOrdering``.
+        seed (int, optional): Seed for breaking the remaining ties randomly.
+        value_ordering (callable, optional): Value ordering heuristic.
+        max_nodes (int, optional): Stop after expanding this many nodes.
+        timeout_s (float, optional): Stop after this many seconds.
+        resume (dict, optional): A ``state`` returned by a stopped search, or
+            loaded with ``load_search_state``, to continue from.
+        checkpoint_path (str, optional): File the search state is written to
+            every ``checkpoint_every`` nodes.
+        checkpoint_every (int, optional): Checkpoint interval in nodes.
+        puzzle (CompiledPuzzle, optional): The CSP already compiled with
+            ``compile_puzzle``, e.g. shared by a worker process.
+        should_stop (callable, optional): Polled at every node; the search is
+            cancelled as soon as it returns True.
+        prefix (dict, optional): Partial assignment the search is restricted
+            to, e.g. one sub-problem of a split search. Its variables are
+            assigned first, in order, and never revisited.
+        backjumping (bool, optional): Use conflict-directed backjumping and
+            learn nogoods. Not available with ``"mac"`` propagation, whose
+            prunings cannot be attributed to a single assignment.
+        max_nogoods (int, optional): Capacity of the nogood store.
+        time_nodes (bool, optional): Record how long every node takes, from its
+            expansion to its first surviving child, in a histogram.
 
     Returns:
-        dict or None: The assignment if successful, None otherwise.
+        dict: The result with keys ``status`` (``"solved"``, ``"unsat"``,
+        ``"node_limit"``, ``"timeout"`` or ``"cancelled"``), ``solution`` (the
+        assignment or None), ``deepest`` (the largest partial assignment
+        reached), ``state`` (the serializable search state when stopped early,
+        None otherwise) and ``stats``. The stats hold the ``nodes`` expanded,
+        the ``consistency_checks`` (values tried against the partial
+        assignment), the ``backtracks``, the ``max_depth`` reached, the domain
+        ``wipeouts``, the ``pattern_hits``, ``pattern_misses`` and
+        ``pattern_evictions`` of the word index's pattern cache during this
+        search, and the ``time_compile_s`` and ``time_search_s`` phase
+        timings. With backjumping they also hold ``backjumps``, ``nogoods``
+        and ``nogood_hits``, and with ``time_nodes`` the ``node_time_us``
+        histogram (power-of-two bucket upper bound in microseconds -> count).
     """
-    if len(assignment) == len(csp):
-        return assignment
-
-    constraint_graph = create_constraint_graph(csp)
-    var = select_unassigned_variable(assignment, csp, constraint_graph)
-
-    for value in order_domain_values_simple(var, assignment, csp):
-        if is_consistent(var, value, assignment, csp):
-            assignment[var] = value
-            result = recursive_backtracking(assignment, csp)
-            if result is not None:
-                return result
-            del assignment[var]
-    return None
-
-def select_unassigned_variable(assignment, csp, constraint_graph):
+    if propagation not in PROPAGATION_MODES:
+        raise ValueError(f"Unknown propagation mode: {propagation}")
+    if backjumping and propagation == "mac":
+        raise ValueError("Backjumping is not supported with MAC propagation")
+    config = {
+        "propagation": propagation,
+        "tie_break": tie_break,
+        "seed": seed,
+        "value_ordering": value_ordering.__name__,
+        "backjumping": backjumping
+    }
+    deadline = None if timeout_s is None else time.time() + timeout_s
+
+    start_time = time.perf_counter()
+    if puzzle is None:
+        puzzle = compile_puzzle(csp, index)
+    compile_s = time.perf_counter() - start_time
+    live = LiveDomains(puzzle.domain_masks)
+    ordering = VariableOrdering(puzzle, live, tie_break, seed)
+    stats = {
+        "nodes": 0,
+        "consistency_checks": 0,
+        "backtracks": 0,
+        "max_depth": 0,
+        "wipeouts": 0,
+        "pattern_hits": 0,
+        "pattern_misses": 0,
+        "pattern_evictions": 0,
+        "time_compile_s": compile_s,
+        "time_search_s": 0.0
+    }
+    if time_nodes:
+        stats["node_time_us"] = {}
+    # The pattern cache outlives the search, only its counters since the start are reported
+    cache = puzzle.index.pattern_cache
+    cache_counters = [cache.hits, cache.misses, cache.evictions]
+    search_started = [time.perf_counter()]
+    assignment = SearchState(puzzle)
+    word_ids = puzzle.index.ids
+    assigned = set()
+    deepest = {}
+    stack = []
+    if backjumping:
+        stats.update(backjumps=0, nogoods=0, nogood_hits=0)
+        nogoods = NogoodStore(max_nogoods)
+        same_length = [
+            {other_id for other_id, other_length in enumerate(puzzle.lengths) if other_length == length}
+            for length in puzzle.lengths
+        ]
+
+    def explain(var_id):
+        # Assigned variables responsible for the current domain of var_id
+        if propagation != "none":
+            return live.pruned_by(var_id) & assigned
+        return (set(puzzle.neighbors[var_id]) | same_length[var_id]) & assigned
+
+    def update_stats():
+        current = [cache.hits, cache.misses, cache.evictions]
+        for key, value, previous in zip(("pattern_hits", "pattern_misses", "pattern_evictions"),
+                                        current, cache_counters):
+            stats[key] += value - previous
+        cache_counters[:] = current
+        now = time.perf_counter()
+        stats["time_search_s"] += now - search_started[0]
+        search_started[0] = now
+
+    def result(status, state=None):
+        update_stats()
+        return {
+            "status": status,
+            "solution": assignment.to_dict() if status == "solved" else None,
+            "deepest": deepest,
+            "state": state,
+            "stats": stats
+        }
+
+    def snapshot():
+        update_stats()
+        return {
+            "version": STATE_VERSION,
+            "config": config,
+            "stack": [
+                {
+                    "var": var,
+                    "values": values,
+                    "position": position,
+                    "conflicts": sorted(puzzle.variables[other_id] for other_id in conflicts)
+                }
+                for var, _, values, position, _, conflicts in stack
+            ],
+            "weights": ordering.weights.tolist(),
+            "deepest": deepest,
+            "stats": dict(stats)
+        }
+
+    if propagation in ("ac3", "mac") and not ac3(puzzle, live):
+        return result("unsat")
+
+    frames = []
+    if prefix is not None:
+        # Single-value frames are exhausted as soon as the search backtracks into them
+        frames = [{"var": var, "values": [value], "position": 0} for var, value in prefix.items()]
+    if resume is not None:
+        if resume.get("version") != STATE_VERSION or resume.get("config") != config:
+            raise ValueError("The search state was saved with a different configuration")
+        ordering.weights[:] = resume["weights"]
+        stats.update(resume["stats"])
+        deepest = dict(resume["deepest"])
+        frames = resume["stack"]
+        stats["time_compile_s"] += compile_s
+
+    # Replay the assignments on the stack to rebuild the live domains
+    for frame in frames:
+        var, values, position = frame["var"], frame["values"], frame["position"]
+        var_id = puzzle.var_ids[var]
+        conflicts = {puzzle.var_ids[other] for other in frame.get("conflicts", ())}
+        stack.append([var, var_id, values, position, live.mark(), conflicts])
+        ordering.assign(var_id)
+        assigned.add(var_id)
+        assignment.assign(var_id, word_ids[puzzle.lengths[var_id]][values[position]])
+        if not propagate(var_id, values[position], assigned, puzzle, live, propagation):
+            if resume is not None:
+                raise ValueError("The search state does not match the puzzle")
+            return result("unsat")
+
+    while True:
+        # Expand a node
+        if len(assignment) == len(csp):
+            return result("solved")
+        if max_nodes is not None and stats["nodes"] >= max_nodes:
+            return result("node_limit", snapshot())
+        if deadline is not None and time.time() >= deadline:
+            return result("timeout", snapshot())
+        if should_stop is not None and should_stop():
+            return result("cancelled", snapshot())
+        if checkpoint_path is not None and stats["nodes"] and stats["nodes"] % checkpoint_every == 0:
+            export_search_state(snapshot(), checkpoint_path)
+
+        stats["nodes"] += 1
+        if time_nodes:
+            node_started = time.perf_counter()
+        var = select_unassigned_variable(assignment, csp, puzzle, ordering)
+        var_id = puzzle.var_ids[var]
+        # Values are pre-filtered against the assigned crossings through the word index
+        values = value_ordering(var, assignment, csp, puzzle, live.masks)
+        stack.append([var, var_id, values, -1, live.mark(), set()])
+        ordering.assign(var_id)
+        assigned.add(var_id)
+
+        # Advance to the next value that survives propagation, backtracking as needed
+        while stack:
+            frame = stack[-1]
+            var, var_id, values, position, mark, conflicts = frame
+            if position >= 0:
+                live.undo(mark)
+                assignment.unassign(var_id)
+            position += 1
+            frame[3] = position
+            if position == len(values):
+                if backjumping:
+                    conflict = (conflicts | explain(var_id)) - {var_id}
+                stack.pop()
+                ordering.unassign(var_id)
+                assigned.discard(var_id)
+                stats["backtracks"] += 1
+                if backjumping:
+                    if not conflict:
+                        # No assignment is to blame: the whole (sub-)problem is unsatisfiable
+                        stack.clear()
+                        continue
+                    nogoods.add((puzzle.variables[other_id], assignment[puzzle.variables[other_id]])
+                                for other_id in conflict)
+                    stats["nogoods"] = len(nogoods)
+                    # Jump straight back to the most recent culprit
+                    while stack[-1][1] not in conflict:
+                        skipped = stack.pop()
+                        assignment.unassign(skipped[1])
+                        ordering.unassign(skipped[1])
+                        assigned.discard(skipped[1])
+                        stats["backjumps"] += 1
+                    stack[-1][5] |= conflict - {stack[-1][1]}
+                continue
+
+            value = values[position]
+            assignment.assign(var_id, word_ids[puzzle.lengths[var_id]][value])
+            stats["consistency_checks"] += 1
+            if backjumping:
+                nogood = nogoods.check(var, value, assignment)
+                if nogood is not None:
+                    stats["nogood_hits"] = nogoods.hits
+                    conflicts |= {puzzle.var_ids[other] for other, _ in nogood} - {var_id}
+                    continue
+            if propagate(var_id, value, assigned, puzzle, live, propagation):
+                if len(assignment) > len(deepest):
+                    deepest = assignment.to_dict()
+                    stats["max_depth"] = len(deepest)
+                break
+            stats["wipeouts"] += 1
+            ordering.record_wipeout(*live.wipeout)
+            if backjumping:
+                conflicts |= live.pruned_by(live.wipeout[0]) & assigned
+        else:
+            return result("unsat")
+        if time_nodes:
+            record_duration(stats["node_time_us"], time.perf_counter() - node_started)
+
+def select_unassigned_variable(assignment, csp, puzzle, ordering=None):
     """
     Select the next unassigned variable using the Minimum Remaining Values (MRV)
     and Degree heuristics.
@@ -49,17 +324,20 @@ def select_unassigned_variable(assignment, csp, constraint_graph):
     Args:
         assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
-        constraint_graph (networkx.Graph): The constraint graph.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        ordering (VariableOrdering, optional): Dynamic ordering over the live
+            domain sizes. Without it, the static domain lengths are used.
 
     Returns:
         str: The selected variable.
     """
+    if ordering is not None:
+        return puzzle.variables[ordering.select()]
+
     unassigned_variables = [var for var in csp if var not in assignment]
 
-    # Sort the unassigned variables based on the number of constraints (degree) and domain size
-    sorted_variables = sorted(
+    # Variable with fewest choices and most constraints
+    return min(
         unassigned_variables,
-        key=lambda var: (len(csp[var]["domain"]), -len(constraint_graph[var]))
+        key=lambda var: (len(csp[var]["domain"]), -len(puzzle.neighbors[puzzle.var_ids[var]]))
     )
-
-    return sorted_variables[0]  # Variable with fewest choices and most constraints 
\ No newline at end of file
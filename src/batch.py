@@ -0,0 +1,243 @@
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from backtracking import search
+from crossword import load_words
+from csp import bucket_words, index_buckets, puzzle2csp
+from loaders import grid_problems, load_grids, read_jsonl
+from portfolio import pool_context
+from solution_cache import CACHED_STATUSES, SolutionCache, dictionary_fingerprint, puzzle_key
+from utils import write_jsonl
+from word_index import build_word_index, load_word_index
+
+# Worker globals, set once per worker process by _init_worker
+_shared = {}
+
+def read_puzzles(filepath):
+    """
+    Stream puzzle records from a JSONL file, see ``loaders.read_jsonl``.
+
+    Args:
+        filepath (str): Path to the JSONL file, ``-`` for standard input.
+
+    Returns:
+        generator: The puzzle records.
+    """
+    return read_jsonl(filepath)
+
+def _worker_initargs(words, index, cache_path=None):
+    # Without a word list, the buckets and the cache fingerprint come from the index
+    buckets = bucket_words(words) if words is not None else index_buckets(index)
+    dictionary = None
+    if cache_path is not None:
+        dictionary = dictionary_fingerprint(
+            words if words is not None else (word for length in index.words for word in index.words[length])
+        )
+    return words, index, buckets, cache_path, dictionary
+
+def _init_worker(words, index, buckets, cache_path=None, dictionary=None):
+    _shared["words"] = words
+    _shared["index"] = index
+    _shared["buckets"] = buckets
+    _shared["cache"] = None if cache_path is None else SolutionCache(cache_path)
+    _shared["dictionary"] = dictionary
+
+def _error_result(record_id, error, start_time):
+    return {
+        "id": record_id,
+        "status": "error",
+        "error": error,
+        "solution": None,
+        "time_s": time.time() - start_time,
+        "stats": {},
+        "cached": False
+    }
+
+def solve_record(record, words, index, timeout_s=None, buckets=None, cache=None, dictionary=None, **config):
+    """
+    Solve a single puzzle record.
+
+    Args:
+        record (dict): The puzzle record, see ``read_puzzles``.
+        words (list): List of words, None when ``buckets`` are given, along
+            with the ``dictionary`` when a ``cache`` is.
+        index (WordIndex): Word index built from ``words``.
+        timeout_s (float, optional): Default time budget of the search.
+        buckets (dict, optional): Words bucketed by ``bucket_words``.
+        cache (SolutionCache, optional): Cache looked up before searching,
+            and receiving the solved and unsat outcomes.
+        dictionary (str, optional): Fingerprint of ``words`` keying the
+            cache, computed when omitted.
+        **config: Search options, see ``search``.
+
+    Returns:
+        dict: The result record with the puzzle ``id``, its ``status``
+        (a ``search`` status, or ``"error"`` with an ``error`` message if the
+        record is invalid, is an error record of ``read_jsonl`` or its grid
+        fails ``grid_problems``), the
+        ``solution``, the wall-clock ``time_s``, the
+        search ``stats`` and whether the outcome was ``cached``.
+    """
+    start_time = time.time()
+    if record.get("status") == "error":
+        return _error_result(record.get("id"), record.get("error"), start_time)
+    try:
+        problems = record.get("problems")
+        if problems is None:
+            problems = grid_problems(record["grid"])
+        if problems:
+            raise ValueError("; ".join(problems))
+        grid = np.array(record["grid"])
+        del_list = record.get("del_list", [])
+        prior_knowledge = record.get("prior_knowledge", {})
+        csp = puzzle2csp(grid, words, del_list=del_list, prior_knowledge=prior_knowledge, buckets=buckets)
+
+        key = None
+        if cache is not None:
+            if dictionary is None:
+                dictionary = dictionary_fingerprint(words)
+            key = puzzle_key(grid, dictionary, del_list, prior_knowledge, config)
+            entry = cache.get(key)
+            if entry is not None:
+                return {
+                    "id": record.get("id"),
+                    "status": entry["status"],
+                    "solution": entry["solution"],
+                    "time_s": time.time() - start_time,
+                    "stats": entry["stats"],
+                    "cached": True
+                }
+        result = search(csp, index=index, timeout_s=record.get("timeout_s", timeout_s), **config)
+    except (KeyError, TypeError, ValueError) as error:
+        return _error_result(record.get("id"), f"{type(error).__name__}: {error}", start_time)
+    if key is not None and result["status"] in CACHED_STATUSES:
+        cache.put(key, result["status"], result["solution"], result["stats"])
+    return {
+        "id": record.get("id"),
+        "status": result["status"],
+        "solution": result["solution"],
+        "time_s": time.time() - start_time,
+        "stats": result["stats"],
+        "cached": False
+    }
+
+def _run_record(record, timeout_s, config):
+    return solve_record(
+        record, _shared["words"], _shared["index"], timeout_s, _shared["buckets"],
+        _shared["cache"], _shared["dictionary"], **config
+    )
+
+def batch_solve(records, words, index=None, workers=None, timeout_s=None, max_pending=None,
+                cache_path=None, **config):
+    """
+    Solve a stream of puzzle records across a pool of worker processes.
+
+    The word list, its length buckets and the index are handed to the workers
+    once, when they start, and shared by every puzzle they solve. Without a
+    word list, the buckets are built lazily from the index with
+    ``index_buckets``, so a memory-mapped index is only decoded for the word
+    lengths the grids use. At most ``max_pending`` records are in flight at a
+    time, so arbitrarily long inputs are streamed rather than loaded
+    upfront. Results are yielded as soon as they are ready, which is
+    not necessarily the input order. A puzzle whose worker fails
+    unexpectedly gets an error result, like an invalid record, and the
+    batch goes on.
+
+    Args:
+        records (iterable): Puzzle records, see ``read_puzzles``.
+        words (list): List of words, None to solve from ``index`` alone.
+        index (WordIndex, optional): Word index built from ``words``. Built
+            when omitted.
+        workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs.
+        timeout_s (float, optional): Default time budget of each puzzle.
+        max_pending (int, optional): Maximum number of records in flight.
+            Defaults to twice the number of workers.
+        cache_path (str, optional): SQLite file of a ``SolutionCache`` shared
+            by the workers.
+        **config: Search options shared by every puzzle, see ``search``.
+
+    Yields:
+        dict: Result records, see ``solve_record``.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    if index is None:
+        index = build_word_index(words)
+
+    records = iter(records)
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=pool_context(),
+        initializer=_init_worker,
+        initargs=_worker_initargs(words, index, cache_path)
+    ) as executor:
+        # Future -> (record id, submission time)
+        pending = {}
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                else:
+                    future = executor.submit(_run_record, record, timeout_s, config)
+                    pending[future] = (record.get("id"), time.time())
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                record_id, start_time = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as error:
+                    result = _error_result(record_id, f"{type(error).__name__}: {error}", start_time)
+                yield result
+
+def main():
+    parser = argparse.ArgumentParser(description="Solve a batch of crossword puzzles from a JSONL file.")
+    parser.add_argument(
+        "puzzles",
+        help="Puzzles: a JSONL file of records (- for standard input), an .xlsx workbook, "
+             "a compact text file or a directory of those"
+    )
+    parser.add_argument("--words", default="data/Words.txt", help="Word list, one word per line")
+    parser.add_argument("--index", help="Binary word index built with word_index.py, used instead of --words")
+    parser.add_argument("--output", default="-", help="JSONL file receiving the results, - for standard output")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--timeout", type=float, help="Time budget of each puzzle in seconds")
+    parser.add_argument("--propagation", default="forward", help="Propagation used by the search")
+    parser.add_argument("--cache", help="SQLite file caching the solved and unsat puzzles across runs")
+    args = parser.parse_args()
+
+    if args.index is not None:
+        index = load_word_index(args.index)
+        words = None
+    else:
+        words = load_words(args.words)
+        index = build_word_index(words)
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        results = batch_solve(
+            load_grids(args.puzzles),
+            words,
+            index,
+            workers=args.workers,
+            timeout_s=args.timeout,
+            cache_path=args.cache,
+            propagation=args.propagation
+        )
+        for result in results:
+            write_jsonl(result, output)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+from backtracking import search
+from crossword import (
+    load_words, sample_words, generate_crossword,
+    define_crossword_small, define_crossword_large, define_crossword_heart
+)
+from csp import bucket_words, puzzle2csp
+from heuristics import order_domain_values_lcv
+
+# Word list of the small puzzle, as in main_small.py
+SMALL_WORDS = ["AFT", "LASER", "ALE", "LEE", "EEL", "LINE", "HEEL", "SAILS", "HIKE", "SHEET", "HOSES",
+               "STEER", "KEEL", "TIE", "KNOT"]
+
+# Solver configurations compared by the benchmark, by name
+BENCHMARK_CONFIGS = {
+    "none": {"propagation": "none"},
+    "forward": {"propagation": "forward"},
+    "forward-wdeg-lcv": {"propagation": "forward", "tie_break": "wdeg", "value_ordering": order_domain_values_lcv},
+    "forward-cbj": {"propagation": "forward", "backjumping": True},
+    "ac3": {"propagation": "ac3"},
+    "mac-lcv": {"propagation": "mac", "value_ordering": order_domain_values_lcv},
+}
+
+# Modules whose cold import time is measured: the solver core and its service entry points
+COLD_START_MODULES = ("backtracking", "batch", "server")
+
+def measure_cold_start(modules=COLD_START_MODULES, repeats=5):
+    """
+    Measure the time a fresh interpreter takes to import each module.
+
+    Each import runs in a new process started from the directory of this
+    module, so nothing is cached in memory; the interpreter startup itself is
+    measured separately and subtracted.
+
+    Args:
+        modules (tuple, optional): Module names to import.
+        repeats (int, optional): Number of processes per module, the median is kept.
+
+    Returns:
+        dict: ``interpreter_s`` (startup of a bare interpreter) and the median
+        import time of every module in seconds.
+    """
+    directory = os.path.dirname(os.path.abspath(__file__))
+
+    def median_run(code):
+        times = []
+        for _ in range(repeats):
+            start_time = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=directory, check=True)
+            times.append(time.perf_counter() - start_time)
+        return statistics.median(times)
+
+    interpreter = median_run("pass")
+    cold_start = {"interpreter_s": interpreter}
+    for module in modules:
+        cold_start[module] = median_run(f"import {module}") - interpreter
+    return cold_start
+
+def benchmark_cases(words, sizes=(5, 7, 9), densities=(0.2,), fractions=(1.0, 0.5), symmetry="rotational",
+                    grids_per_size=2, seed=0):
+    """
+    Build the benchmark cases: the hand-coded grids plus generated ones.
+
+    Generated grids are drawn for every size and density, and every grid
+    except the small one is paired with every dictionary fraction. All the
+    draws derive from ``seed``, so the cases are reproducible.
+
+    Args:
+        words (list): The full word list.
+        sizes (tuple, optional): Side lengths of the generated square grids.
+        densities (tuple, optional): Black square densities of the generated grids.
+        fractions (tuple, optional): Fractions of the word list to sample.
+        symmetry (str, optional): Symmetry of the generated grids.
+        grids_per_size (int, optional): Generated grids per size and density.
+        seed (int, optional): Base seed of the random draws.
+
+    Returns:
+        list: Cases as dicts with ``name``, ``crossword``, ``words``,
+        ``fraction`` and ``del_list``.
+    """
+    cases = [{
+        "name": "small",
+        "crossword": define_crossword_small(),
+        "words": SMALL_WORDS,
+        "fraction": 1.0,
+        "del_list": ["2across"]
+    }]
+    grids = [("large", define_crossword_large()), ("heart", define_crossword_heart())]
+    for size in sizes:
+        for density in densities:
+            for i in range(grids_per_size):
+                grid_seed = seed + 1000 * size + 100 * i + int(density * 100)
+                grids.append((
+                    f"generated-{size}x{size}-d{density}-s{grid_seed}",
+                    generate_crossword(size, size, density, symmetry, grid_seed)
+                ))
+
+    subsamples = {
+        fraction: words if fraction >= 1 else sample_words(words, fraction, seed)
+        for fraction in fractions
+    }
+    for name, crossword in grids:
+        for fraction, sample in subsamples.items():
+            cases.append({
+                "name": name,
+                "crossword": crossword,
+                "words": sample,
+                "fraction": fraction,
+                "del_list": []
+            })
+    return cases
+
+def benchmark_case(case, config, repeats=3, timeout_s=10.0, memory=True):
+    """
+    Time one solver configuration on one case.
+
+    Every repetition compiles the CSP from scratch, so that caches attached
+    to the word index do not carry over between repetitions. The memory peak
+    is measured with ``tracemalloc`` on one extra run, which would otherwise
+    slow the timed runs down.
+
+    Args:
+        case (dict): A case from ``benchmark_cases``.
+        config (dict): Keyword arguments for ``search``.
+        repeats (int, optional): Number of timed runs.
+        timeout_s (float, optional): Time budget of each run.
+        memory (bool, optional): Measure the memory peak.
+
+    Returns:
+        dict: The measurements, with the ``status`` of every run, the
+        ``time_s`` (min, median and max wall-clock time of a run), the
+        ``nodes`` and ``nodes_per_s`` of the median run, the median
+        ``time_to_first_solution_s`` (None unless every run solved the
+        puzzle) and the ``peak_memory_bytes``.
+    """
+    buckets = bucket_words(case["words"])
+    runs = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        csp = puzzle2csp(case["crossword"], case["words"], del_list=case["del_list"], buckets=buckets)
+        result = search(csp, timeout_s=timeout_s, **config)
+        runs.append((time.perf_counter() - start_time, result))
+
+    times = sorted(elapsed for elapsed, _ in runs)
+    median_time = statistics.median(times)
+    median_run = min(runs, key=lambda run: abs(run[0] - median_time))[1]
+    search_time = median_run["stats"]["time_search_s"]
+    solved = all(result["status"] == "solved" for _, result in runs)
+
+    peak_memory = None
+    if memory:
+        tracemalloc.start()
+        csp = puzzle2csp(case["crossword"], case["words"], del_list=case["del_list"], buckets=buckets)
+        search(csp, timeout_s=timeout_s, **config)
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    return {
+        "status": [result["status"] for _, result in runs],
+        "time_s": {"min": times[0], "median": median_time, "max": times[-1]},
+        "nodes": median_run["stats"]["nodes"],
+        "nodes_per_s": median_run["stats"]["nodes"] / search_time if search_time > 0 else None,
+        "time_to_first_solution_s": median_time if solved else None,
+        "peak_memory_bytes": peak_memory
+    }
+
+def run_benchmark(cases, configs=None, repeats=3, timeout_s=10.0, memory=True, progress=None):
+    """
+    Run every configuration on every case.
+
+    Args:
+        cases (list): Cases from ``benchmark_cases``.
+        configs (dict, optional): Configuration name -> keyword arguments for
+            ``search``. Defaults to ``BENCHMARK_CONFIGS``.
+        repeats (int, optional): Number of timed runs per measurement.
+        timeout_s (float, optional): Time budget of each run.
+        memory (bool, optional): Measure the memory peaks.
+        progress (callable, optional): Called with every measurement as it
+            completes.
+
+    Returns:
+        dict: The report, with the ``environment`` and ``settings`` of the
+        run and one ``results`` entry per case and configuration.
+    """
+    if configs is None:
+        configs = BENCHMARK_CONFIGS
+    results = []
+    for case in cases:
+        for config_name, config in configs.items():
+            measurement = {
+                "case": case["name"],
+                "dictionary_fraction": case["fraction"],
+                "dictionary_size": len(case["words"]),
+                "config": config_name,
+                **benchmark_case(case, config, repeats, timeout_s, memory)
+            }
+            results.append(measurement)
+            if progress is not None:
+                progress(measurement)
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "timestamp": time.time()
+        },
+        "settings": {
+            "repeats": repeats,
+            "timeout_s": timeout_s,
+            "configs": {
+                name: {
+                    key: value.__name__ if callable(value) else value
+                    for key, value in config.items()
+                }
+                for name, config in configs.items()
+            }
+        },
+        "results": results
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the solver configurations on reproducible puzzles.")
+    parser.add_argument("--words", default="data/Words.txt", help="Word list, one word per line")
+    parser.add_argument("--output", default="-", help="JSON file receiving the report, - for standard output")
+    parser.add_argument("--configs", nargs="+", choices=sorted(BENCHMARK_CONFIGS), help="Configurations to run")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 7, 9], help="Sizes of the generated grids")
+    parser.add_argument("--densities", type=float, nargs="+", default=[0.2], help="Black square densities")
+    parser.add_argument("--fractions", type=float, nargs="+", default=[1.0, 0.5], help="Dictionary fractions")
+    parser.add_argument("--symmetry", default="rotational", help="Symmetry of the generated grids")
+    parser.add_argument("--grids-per-size", type=int, default=2, help="Generated grids per size and density")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed of the generated grids and samples")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per measurement")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Time budget of each run in seconds")
+    parser.add_argument("--no-memory", action="store_true", help="Skip the memory peak measurements")
+    parser.add_argument("--cold-start-repeats", type=int, default=5, help="Processes per cold import measurement")
+    args = parser.parse_args()
+
+    cases = benchmark_cases(
+        load_words(args.words), args.sizes, args.densities, args.fractions, args.symmetry,
+        args.grids_per_size, args.seed
+    )
+    configs = BENCHMARK_CONFIGS
+    if args.configs:
+        configs = {name: BENCHMARK_CONFIGS[name] for name in args.configs}
+
+    def progress(measurement):
+        print(
+            f"{measurement['case']} x{measurement['dictionary_fraction']} {measurement['config']}: "
+            f"{measurement['status'][0]} in {measurement['time_s']['median']:.3f}s",
+            file=sys.stderr
+        )
+
+    report = run_benchmark(cases, configs, args.repeats, args.timeout, not args.no_memory, progress)
+    report["cold_start"] = measure_cold_start(repeats=args.cold_start_repeats)
+    if args.output == "-":
+        print(json.dumps(report, indent=2))
+    else:
+        with open(args.output, "w") as file:
+            file.write(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import numpy as np
+
+from consistent import get_word_positions
+from word_index import build_word_index
+
+class CompiledPuzzle:
+    """
+    Integer-indexed view of a CSP, built once before the search starts.
+
+    Variables are addressed by their position in ``variables`` so that the
+    search loop never has to recompute word positions or rebuild a graph.
+
+    Attributes:
+        variables (list): Variable names; the index of a name is its id.
+        var_ids (dict): Mapping from variable name to id.
+        lengths (list): Word length of each variable.
+        positions (list): Grid cells occupied by each variable.
+        shape (tuple): Shape of the smallest grid holding every variable.
+        cells (list): Flat cell indices, in that grid, occupied by each variable.
+        neighbors (list): Sorted ids of the variables crossing each variable.
+        crossings (list): One ``(var_i, idx_i, var_j, idx_j)`` tuple per shared
+            cell, with ``var_i < var_j``.
+        crossings_of (list): For each variable, ``(idx_i, var_j, idx_j)`` tuples
+            describing every cell it shares with another variable.
+        index (WordIndex): Letter-position index covering every domain word.
+        domain_ids (list): Word ids of each variable's domain, in domain order.
+        domain_masks (list): Boolean mask of each variable's domain over the
+            index bucket of its length.
+        frequencies (LetterFrequencies or None): Letter-frequency model, built
+            on first use by ``frequency.letter_frequencies``.
+    """
+
+    def __init__(self, variables, lengths, positions, crossings, index, domain_ids):
+        self.variables = variables
+        self.var_ids = {var: i for i, var in enumerate(variables)}
+        self.lengths = lengths
+        self.positions = positions
+        self.crossings = crossings
+
+        rows = max((row for var_positions in positions for row, _ in var_positions), default=-1) + 1
+        cols = max((col for var_positions in positions for _, col in var_positions), default=-1) + 1
+        self.shape = (rows, cols)
+        self.cells = [
+            np.array([row * cols + col for row, col in var_positions], dtype=np.int64)
+            for var_positions in positions
+        ]
+
+        self.crossings_of = [[] for _ in variables]
+        for var_i, idx_i, var_j, idx_j in crossings:
+            self.crossings_of[var_i].append((idx_i, var_j, idx_j))
+            self.crossings_of[var_j].append((idx_j, var_i, idx_i))
+
+        self.neighbors = [
+            sorted({var_j for _, var_j, _ in crossing_list})
+            for crossing_list in self.crossings_of
+        ]
+
+        self.index = index
+        self.domain_ids = domain_ids
+        self.domain_masks = []
+        for length, ids in zip(lengths, domain_ids):
+            mask = np.zeros(index.size(length), dtype=bool)
+            mask[ids] = True
+            self.domain_masks.append(mask)
+        self.frequencies = None
+
+    def __len__(self):
+        return len(self.variables)
+
+def compile_puzzle(csp, index=None):
+    """
+    Compile a CSP produced by ``puzzle2csp`` into a ``CompiledPuzzle``.
+
+    Crossings are found by bucketing every occupied cell, which is linear in
+    the number of cells instead of quadratic in the number of variables.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Index built from the full word list. It
+            is never modified, so it can be shared across searches: domain
+            words missing from it (e.g. prior knowledge) go to an overlay, see
+            ``WordIndex.overlay``. When omitted, an index is built from the
+            domains themselves.
+
+    Returns:
+        CompiledPuzzle: The compiled puzzle.
+    """
+    variables = list(csp)
+    lengths = [csp[var]["length"] for var in variables]
+    positions = [get_word_positions(var, csp) for var in variables]
+
+    # Map each cell to the (variable id, letter index) pairs occupying it
+    cells = {}
+    for var_id, var_positions in enumerate(positions):
+        for idx, pos in enumerate(var_positions):
+            cells.setdefault(pos, []).append((var_id, idx))
+
+    crossings = []
+    for occupants in cells.values():
+        for a in range(len(occupants)):
+            for b in range(a + 1, len(occupants)):
+                (var_i, idx_i), (var_j, idx_j) = sorted((occupants[a], occupants[b]))
+                crossings.append((var_i, idx_i, var_j, idx_j))
+    crossings.sort()
+
+    domain_words = [csp[var]["domain"] for var in variables]
+    # Domains are shared by reference between slots of the same length
+    unique_domains = list({id(domain): domain for domain in domain_words}.values())
+    if index is None:
+        index = build_word_index(word for domain in unique_domains for word in domain)
+    else:
+        index = index.overlay(word for domain in unique_domains for word in domain)
+
+    domain_ids = []
+    translated = {}
+    for length, domain in zip(lengths, domain_words):
+        key = (id(domain), length)
+        if key not in translated:
+            ids = index.ids.get(length, {})
+            translated[key] = np.array([ids[word] for word in domain if len(word) == length], dtype=np.int64)
+        domain_ids.append(translated[key])
+
+    return CompiledPuzzle(variables, lengths, positions, crossings, index, domain_ids)
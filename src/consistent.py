@@ -1,4 +1,6 @@
-def is_consistent(var, value, assignment, csp):
+from state import SearchState
+
+def is_consistent(var, value, assignment, csp, puzzle=None):
     """
     Check if assigning a value to a variable is consistent with the current assignment.
 
@@ -7,10 +9,20 @@ def is_consistent(var, value, assignment, csp):
         value (str): The value to assign to the variable.
         assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle, optional): Precompiled crossing table. When given,
+            only the crossings of ``var`` are checked.
 
     Returns:
         bool: True if consistent, False otherwise.
     """
+    if puzzle is not None:
+        variables = puzzle.variables
+        for idx_var, other_id, idx_other in puzzle.crossings_of[puzzle.var_ids[var]]:
+            other_value = assignment.get(variables[other_id])
+            if other_value is not None and value[idx_var] != other_value[idx_other]:
+                return False
+        return True
+
     for other_var in assignment:
         if other_var != var:
             other_value = assignment[other_var]
@@ -23,6 +35,94 @@ def is_consistent(var, value, assignment, csp):
                     return False
     return True
 
+def consistent_mask(var_id, assignment, puzzle, domains=None):
+    """
+    Get the mask of the domain values of a variable that agree with every
+    assigned crossing and are not already used by another variable.
+
+    The domain mask is ANDed with one letter-position bitset per assigned
+    crossing, so the whole domain is filtered in a single vectorized step.
+    With a ``SearchState``, the crossing letters form a pattern whose matches
+    are memoized by the word index.
+
+    Args:
+        var_id (int): The variable id in the compiled puzzle.
+        assignment (dict or SearchState): Current assignments of variables. A
+            ``SearchState`` is read directly from its letter grid.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        domains (list, optional): Live domain masks, indexed by variable id.
+            Defaults to the static domains of the puzzle.
+
+    Returns:
+        np.ndarray: Boolean mask over the index bucket of the variable's length.
+    """
+    length = puzzle.lengths[var_id]
+    index = puzzle.index
+    variables = puzzle.variables
+
+    if domains is None:
+        domains = puzzle.domain_masks
+    mask = domains[var_id].copy()
+
+    if isinstance(assignment, SearchState):
+        # Read the crossing letters and used words straight from the state
+        pattern = assignment.pattern(var_id)
+        if pattern.any():
+            mask &= index.match_pattern(length, pattern)
+        used = assignment.used.get(length)
+        if used:
+            mask[list(used)] = False
+        return mask
+
+    for idx_var, other_id, idx_other in puzzle.crossings_of[var_id]:
+        other_value = assignment.get(variables[other_id])
+        if other_value is not None:
+            mask &= index.bitset(length, idx_var, other_value[idx_other])
+
+    # Remove the values that have been already assigned
+    ids = index.ids.get(length, {})
+    for value in assignment.values():
+        word_id = ids.get(value)
+        if word_id is not None and len(value) == length:
+            mask[word_id] = False
+    return mask
+
+def consistent_ids(var_id, assignment, puzzle, domains=None):
+    """
+    Get the word ids of the consistent domain values of a variable, in domain order.
+
+    Args:
+        var_id (int): The variable id in the compiled puzzle.
+        assignment (dict): Current assignments of variables.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        domains (list, optional): Live domain masks, indexed by variable id.
+
+    Returns:
+        np.ndarray: Word ids over the index bucket of the variable's length.
+    """
+    mask = consistent_mask(var_id, assignment, puzzle, domains)
+    domain_ids = puzzle.domain_ids[var_id]
+    return domain_ids[mask[domain_ids]]
+
+def consistent_values(var, assignment, puzzle, domains=None):
+    """
+    Get the domain values of a variable that agree with every assigned crossing
+    and are not already used by another variable.
+
+    Args:
+        var (str): The variable to assign.
+        assignment (dict): Current assignments of variables.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        domains (list, optional): Live domain masks, indexed by variable id.
+            Defaults to the static domains of the puzzle.
+
+    Returns:
+        list: Consistent domain values, in domain order.
+    """
+    var_id = puzzle.var_ids[var]
+    ids = consistent_ids(var_id, assignment, puzzle, domains)
+    return puzzle.index.lookup(puzzle.lengths[var_id], ids)
+
 def get_overlap_positions(var1, var2, csp):
     """
     Get overlapping positions between two variables.
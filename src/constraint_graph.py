@@ -1,26 +1,32 @@
-import networkx as nx
-
 def create_constraint_graph(csp):
     """
     Create a constraint graph from the given CSP.
 
+    The graph is a plain adjacency mapping, so building it needs no graph
+    library; ``visualization.to_networkx`` converts it for plotting. Crossing
+    variables are found by bucketing the cells they occupy, which is linear
+    in the number of cells.
+
     Args:
         csp (dict): The constraint satisfaction problem.
 
     Returns:
-        networkx.Graph: The constraint graph.
+        dict: Mapping from each variable to the set of variables it crosses.
     """
-    constraint_graph = nx.Graph()
+    constraint_graph = {var: set() for var in csp}
 
-    # Add nodes for each variable
-    constraint_graph.add_nodes_from(csp.keys())
+    # Map each cell to the variables occupying it
+    cells = {}
+    for var in csp:
+        for position in get_word_positions(var, csp):
+            cells.setdefault(position, []).append(var)
 
     # Add edges for conflicts between variables
-    for var1 in csp:
-        for var2 in csp:
-            if var1 != var2:
-                if conflicts_exist(var1, var2, csp):
-                    constraint_graph.add_edge(var1, var2)
+    for occupants in cells.values():
+        for var1 in occupants:
+            for var2 in occupants:
+                if var1 != var2:
+                    constraint_graph[var1].add(var2)
 
     return constraint_graph
 
@@ -73,4 +73,65 @@ def define_crossword_heart():
         [-1,-1,-1,-1,33,0,0,0,0,-1,-1,-1,-1],
         [-1,-1,-1,-1,-1,34,0,0,-1,-1,-1,-1,-1],
         [-1,-1,-1,-1,-1,-1,0,-1,-1,-1,-1,-1,-1]
-    ]) 
\ No newline at end of file
+    ])
+
+def sample_words(words, fraction, seed=None):
+    """
+    Draw a random subsample of a word list, keeping the original word order.
+
+    Args:
+        words (list): List of words.
+        fraction (float): Fraction of the words kept, between 0 and 1.
+        seed (int, optional): Seed of the random draw.
+
+    Returns:
+        list: The sampled words.
+    """
+    rng = np.random.default_rng(seed)
+    keep = rng.random(len(words)) < fraction
+    return [word for word, kept in zip(words, keep) if kept]
+
+def generate_crossword(rows, cols, density=0.2, symmetry="rotational", seed=None):
+    """
+    Generate a random crossword grid in the format of ``define_crossword_*``.
+
+    Black squares are drawn at random and mirrored according to
+    ``symmetry``, and open cells walled in by black squares are filled in.
+    Every cell starting an across or down run of at least two open cells is
+    then numbered, row by row.
+
+    Args:
+        rows (int): Number of rows.
+        cols (int): Number of columns.
+        density (float, optional): Probability of a cell being black.
+        symmetry (str, optional): ``"rotational"`` (180 degrees, as in
+            published crosswords), ``"mirror"`` (left-right) or ``"none"``.
+        seed (int, optional): Seed of the random draw.
+
+    Returns:
+        np.array: The crossword grid.
+    """
+    if symmetry not in ("rotational", "mirror", "none"):
+        raise ValueError(f"Unknown symmetry: {symmetry}")
+    rng = np.random.default_rng(seed)
+    black = rng.random((rows, cols)) < density
+    if symmetry == "rotational":
+        black |= black[::-1, ::-1]
+    elif symmetry == "mirror":
+        black |= black[:, ::-1]
+    # Open cells walled in on every side would belong to no slot
+    padded = np.pad(black, 1, constant_values=True)
+    black |= padded[:-2, 1:-1] & padded[2:, 1:-1] & padded[1:-1, :-2] & padded[1:-1, 2:]
+
+    crossword = np.where(black, -1, 0)
+    number = 1
+    for row in range(rows):
+        for col in range(cols):
+            if black[row, col]:
+                continue
+            starts_across = (col == 0 or black[row, col - 1]) and col + 1 < cols and not black[row, col + 1]
+            starts_down = (row == 0 or black[row - 1, col]) and row + 1 < rows and not black[row + 1, col]
+            if starts_across or starts_down:
+                crossword[row, col] = number
+                number += 1
+    return crossword
@@ -1,70 +1,141 @@
+from functools import partial
+
 import numpy as np
 
-def puzzle2csp(crossword, words, del_list=[], prior_knowledge={}):
+from word_index import _LazyBuckets
+
+def vowel_count(word):
+    """
+    Number of vowels in a word, used to sort the domains.
+    """
+    return sum(1 for letter in word if letter.lower() in "aeiou")
+
+def bucket_words(words):
+    """
+    Bucket words by length, each bucket sorted by decreasing number of vowels.
+
+    Callers compiling many grids over the same word list can build the buckets
+    once and pass them to ``puzzle2csp``.
+
+    Args:
+        words (list): List of possible words.
+
+    Returns:
+        dict: Length -> list of words.
+    """
+    buckets = {}
+    for word in words:
+        buckets.setdefault(len(word), []).append(word)
+    return {
+        length: sorted(bucket, key=vowel_count, reverse=True)
+        for length, bucket in buckets.items()
+    }
+
+def _sorted_bucket(index, length):
+    return sorted(index.words[length], key=vowel_count, reverse=True)
+
+def index_buckets(index):
+    """
+    Bucket the words of a ``WordIndex`` like ``bucket_words``, without
+    reading its words upfront.
+
+    Each bucket is sorted on first access, so with an index opened by
+    ``load_word_index`` only the lengths the grids use are ever decoded.
+
+    Args:
+        index (WordIndex): The word index.
+
+    Returns:
+        MutableMapping: Length -> list of words, built lazily.
+    """
+    return _LazyBuckets(partial(_sorted_bucket, index), list(index.matrices))
+
+def _run_lengths(open_cells):
+    """
+    Length of the run of open cells starting at each cell and going right.
+
+    Args:
+        open_cells (np.ndarray): Boolean grid of the open cells.
+
+    Returns:
+        np.ndarray: Integer grid, 0 on blocked cells.
+    """
+    rows, cols = open_cells.shape
+    # A blocked sentinel column ends every run at the end of its row
+    padded = np.zeros((rows, cols + 1), dtype=bool)
+    padded[:, :cols] = open_cells
+    flat = padded.ravel()
+    positions = np.arange(flat.size)
+    blocked = np.where(flat, flat.size, positions)
+    next_blocked = np.minimum.accumulate(blocked[::-1])[::-1]
+    return (next_blocked - positions).reshape(rows, cols + 1)[:, :cols]
+
+def find_slots(crossword):
+    """
+    Find every slot of a crossword grid with run-length detection.
+
+    A slot starts at every numbered cell followed by an open cell, across or
+    down, and spans the run of open cells from there. Slots are returned in
+    row-major order of their starting cell, across before down.
+
+    Args:
+        crossword (np.array): The crossword puzzle grid.
+
+    Returns:
+        list: ``(number, direction, (row, col), length)`` tuples.
+    """
+    crossword = np.asarray(crossword)
+    open_cells = crossword >= 0
+    numbered = crossword > 0
+    across = _run_lengths(open_cells)
+    down = _run_lengths(open_cells.T).T
+
+    starts = []
+    for direction, code, runs in (("across", 0, across), ("down", 1, down)):
+        rows, cols = np.nonzero(numbered & (runs >= 2))
+        starts.extend(
+            ((row * crossword.shape[1] + col) * 2 + code, direction, row, col, runs[row, col])
+            for row, col in zip(rows.tolist(), cols.tolist())
+        )
+    starts.sort()
+    return [
+        (int(crossword[row, col]), direction, (row, col), int(length))
+        for _, direction, row, col, length in starts
+    ]
+
+def puzzle2csp(crossword, words, del_list=[], prior_knowledge={}, buckets=None):
     """
     Converts a crossword puzzle into a CSP problem.
 
+    Slots are found with ``find_slots``. Domains are sorted by decreasing
+    number of vowels and shared by reference between the slots of the same
+    length, so they must not be mutated.
+
     Args:
         crossword (np.array): The crossword puzzle grid.
         words (list): List of possible words.
         del_list (list, optional): Variables to be deleted from the CSP.
         prior_knowledge (dict, optional): Pre-assigned values for certain variables.
+        buckets (dict, optional): Words bucketed by ``bucket_words`` or
+            ``index_buckets``, reused instead of bucketing ``words`` again.
 
     Returns:
         dict: A dictionary representing the CSP with variables and their domains.
     """
+    if buckets is None:
+        buckets = bucket_words(words)
+
     domains = {}
-    # Add domains to the list for each word in the crossword puzzle
-    for row in range(crossword.shape[0]):
-        for col in range(crossword.shape[1]):
-            if crossword[row][col] > 0:
-                # Check if the word is across
-                if col + 1 < crossword.shape[1] and crossword[row][col + 1] >= 0:
-                    # Determine the length of the word
-                    word_length = 1
-                    for i in range(col + 1, crossword.shape[1]):
-                        if crossword[row][i] >= 0:
-                            word_length += 1
-                        else:
-                            break
-
-                    # Obtain the domain 
-                    domain = [word for word in words if len(word) == word_length]
-                    # Sort the domain by the number of vowels in the word
-                    domain = sorted(domain, key=lambda value: sum([1 for letter in value if letter.lower() in "aeiou"]), reverse=True)
-
-                    # Add the domain to the list if it is not empty:
-                    if len(domain) > 0:
-                        var_name = f"{crossword[row][col]}across"
-                        domains[var_name] = {
-                            "starting_position": (row, col),
-                            "length": word_length,
-                            "direction": "across",
-                            "domain": domain
-                        }
-
-                # Check if the word is down
-                if row + 1 < crossword.shape[0] and crossword[row + 1][col] >= 0:
-                    # Determine the length of the word
-                    word_length = 1
-                    for i in range(row + 1, crossword.shape[0]):
-                        if crossword[i][col] >= 0:
-                            word_length += 1
-                        else:
-                            break
-
-                    # Obtain the domain 
-                    domain = [word for word in words if len(word) == word_length]
-
-                    # Add the domain to the list if it is not empty:
-                    if len(domain) > 0:
-                        var_name = f"{crossword[row][col]}down"
-                        domains[var_name] = {
-                            "starting_position": (row, col),
-                            "length": word_length,
-                            "direction": "down",
-                            "domain": domain
-                        }
+    for number, direction, position, length in find_slots(crossword):
+        domain = buckets.get(length)
+        # Only add the variable if its domain is not empty
+        if domain:
+            domains[f"{number}{direction}"] = {
+                "starting_position": position,
+                "length": length,
+                "direction": direction,
+                "domain": domain
+            }
 
     # Remove the variables that are not in the crossword puzzle
     for var in del_list:
@@ -76,4 +147,4 @@ def puzzle2csp(crossword, words, del_list=[], prior_knowledge={}):
         if var in domains:
             domains[var]["domain"] = values
 
-    return domains 
\ No newline at end of file
+    return domains
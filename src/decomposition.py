@@ -0,0 +1,281 @@
+import time
+
+from backtracking import search
+from constraint_graph import create_constraint_graph, get_word_positions
+from word_index import build_word_index
+
+class _Stopped(Exception):
+    """
+    Raised when a sub-search stops early, carrying its status.
+    """
+
+    def __init__(self, status):
+        super().__init__(status)
+        self.status = status
+
+def connected_components(constraint_graph):
+    """
+    Connected components of a constraint graph.
+
+    Args:
+        constraint_graph (dict): Mapping from each variable to its neighbors.
+
+    Returns:
+        list: Components as lists of variables, in the order of the graph.
+    """
+    order = {var: position for position, var in enumerate(constraint_graph)}
+    seen = set()
+    components = []
+    for start in constraint_graph:
+        if start in seen:
+            continue
+        seen.add(start)
+        component = []
+        stack = [start]
+        while stack:
+            var = stack.pop()
+            component.append(var)
+            for neighbor in constraint_graph[var]:
+                if neighbor not in seen:
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        components.append(sorted(component, key=order.get))
+    return components
+
+def articulation_points(constraint_graph):
+    """
+    Articulation slots of a constraint graph: the variables whose removal
+    disconnects their component.
+
+    Uses an iterative Hopcroft-Tarjan depth-first search.
+
+    Args:
+        constraint_graph (dict): Mapping from each variable to its neighbors.
+
+    Returns:
+        set: The articulation variables.
+    """
+    discovery = {}
+    low = {}
+    points = set()
+    for root in constraint_graph:
+        if root in discovery:
+            continue
+        discovery[root] = low[root] = len(discovery)
+        root_children = 0
+        stack = [(root, None, iter(constraint_graph[root]))]
+        while stack:
+            var, parent, neighbors = stack[-1]
+            advanced = False
+            for neighbor in neighbors:
+                if neighbor == parent:
+                    continue
+                if neighbor in discovery:
+                    low[var] = min(low[var], discovery[neighbor])
+                    continue
+                discovery[neighbor] = low[neighbor] = len(discovery)
+                if var == root:
+                    root_children += 1
+                stack.append((neighbor, var, iter(constraint_graph[neighbor])))
+                advanced = True
+                break
+            if advanced:
+                continue
+            stack.pop()
+            if parent is not None:
+                low[parent] = min(low[parent], low[var])
+                if parent != root and low[var] >= discovery[parent]:
+                    points.add(parent)
+        if root_children > 1:
+            points.add(root)
+    return points
+
+def _best_split(constraint_graph, points):
+    """
+    Pick the articulation slot leaving the smallest largest piece.
+
+    Returns:
+        tuple: The pivot variable and the pieces left once it is removed.
+    """
+    best = None
+    for pivot in points:
+        remaining = {
+            var: neighbors - {pivot}
+            for var, neighbors in constraint_graph.items()
+            if var != pivot
+        }
+        pieces = connected_components(remaining)
+        score = max(len(piece) for piece in pieces)
+        if best is None or score < best[0]:
+            best = (score, pivot, pieces)
+    return best[1], best[2]
+
+def restrict_csp(csp, variables, used, letters):
+    """
+    Restrict a CSP to some of its variables.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        variables (list): The variables kept.
+        used (set): Words no kept variable may take.
+        letters (dict): Variable -> ``(index, letter)`` pairs its words must match.
+
+    Returns:
+        dict: The sub-CSP. Domains left untouched are shared with ``csp``.
+    """
+    used_lengths = {len(word) for word in used}
+    sub_csp = {}
+    for var in variables:
+        slot = csp[var]
+        constraints = letters.get(var, ())
+        domain = slot["domain"]
+        # One pass per letter, the first ones already discard most of the words
+        for idx, letter in constraints:
+            domain = [word for word in domain if word[idx] == letter]
+        if slot["length"] in used_lengths:
+            domain = [word for word in domain if word not in used]
+        sub_csp[var] = dict(slot, domain=domain)
+    return sub_csp
+
+def decomposed_search(csp, index=None, timeout_s=None, min_split=4, direct_nodes=2000, **config):
+    """
+    Solve a CSP region by region along its constraint graph.
+
+    Connected components are solved one after the other, each one avoiding
+    the words already used by the previous ones, so the time spent is the sum
+    of their solve times instead of the size of their product space. Every
+    region is first searched directly with a budget of ``direct_nodes``,
+    which settles most of them at once. Only when that budget runs out is the
+    region split: an articulation slot splitting it into the most balanced
+    pieces is assigned first. For each of its values, the pieces are then
+    solved independently, recursively splitting them further. The outcome of
+    a piece only depends on the letters the slot imposes on it, so outcomes
+    are cached by those letters and a piece failing for some letters is never
+    searched again for another word sharing them.
+
+    Words are used at most once across the whole grid, which couples regions
+    through their same-length slots. When the words of one region make
+    another one fail although it is solvable on its own, the regions
+    involved are searched jointly instead (counted in ``fallbacks``).
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index shared by every sub-search.
+        timeout_s (float, optional): Time budget of the whole search.
+        min_split (int, optional): Regions with fewer slots are searched
+            directly.
+        direct_nodes (int, optional): Node budget of the direct search of a
+            region before it is split, None to always split.
+        **config: Search options of the sub-searches, see ``search``.
+
+    Returns:
+        dict: The result with keys ``status`` (``"solved"``, ``"unsat"`` or the
+        status of the sub-search that stopped early), ``solution``,
+        ``deepest`` (the regions solved so far) and ``stats`` (summed
+        ``nodes``, the number of ``components``, articulation ``splits``,
+        ``piece_cache_hits`` and ``fallbacks``).
+    """
+    deadline = None if timeout_s is None else time.time() + timeout_s
+    if index is None:
+        index = build_word_index(word for var in csp for word in csp[var]["domain"])
+    constraint_graph = create_constraint_graph(csp)
+    positions = {var: get_word_positions(var, csp) for var in csp}
+    stats = {"nodes": 0, "components": 0, "splits": 0, "piece_cache_hits": 0, "fallbacks": 0}
+
+    def run_search(sub_csp, max_nodes=None):
+        # The solution, None when unsatisfiable, or False when the node budget ran out
+        remaining = None
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                raise _Stopped("timeout")
+        result = search(sub_csp, index=index, timeout_s=remaining, max_nodes=max_nodes, **config)
+        stats["nodes"] += result["stats"]["nodes"]
+        if result["status"] == "solved":
+            return result["solution"]
+        if result["status"] == "unsat":
+            return None
+        if result["status"] == "node_limit" and max_nodes is not None:
+            return False
+        raise _Stopped(result["status"])
+
+    def imposed_letters(pivot, word, piece):
+        # Letters the pivot's word imposes on the slots of a piece
+        cells = {position: word[idx] for idx, position in enumerate(positions[pivot])}
+        imposed = {}
+        for var in piece:
+            for idx, position in enumerate(positions[var]):
+                if position in cells:
+                    imposed.setdefault(var, []).append((idx, cells[position]))
+        return imposed
+
+    def solve(variables, used, letters):
+        sub_csp = restrict_csp(csp, variables, used, letters)
+        if len(variables) < min_split:
+            return run_search(sub_csp)
+        members = set(variables)
+        sub_graph = {var: constraint_graph[var] & members for var in variables}
+        points = articulation_points(sub_graph)
+        if not points:
+            return run_search(sub_csp)
+        if direct_nodes is not None:
+            solution = run_search(sub_csp, direct_nodes)
+            if solution is not False:
+                return solution
+
+        pivot, pieces = _best_split(sub_graph, points)
+        stats["splits"] += 1
+        cache = {}
+        conflicted = False
+        for word in sub_csp[pivot]["domain"]:
+            solution = {pivot: word}
+            taken = used | {word}
+            for piece_id, piece in enumerate(pieces):
+                imposed = imposed_letters(pivot, word, piece)
+                key = (piece_id, tuple(sorted((var, tuple(pairs)) for var, pairs in imposed.items())))
+                piece_letters = {
+                    var: tuple(letters.get(var, ())) + tuple(imposed.get(var, ()))
+                    for var in piece
+                }
+                if key in cache:
+                    stats["piece_cache_hits"] += 1
+                else:
+                    cache[key] = solve(piece, used, piece_letters)
+                piece_solution = cache[key]
+                if piece_solution is None:
+                    break
+                if taken.intersection(piece_solution.values()):
+                    piece_solution = solve(piece, taken, piece_letters)
+                    if piece_solution is None:
+                        conflicted = True
+                        break
+                solution.update(piece_solution)
+                taken.update(piece_solution.values())
+            else:
+                return solution
+
+        if conflicted:
+            stats["fallbacks"] += 1
+            return run_search(sub_csp)
+        return None
+
+    solution = {}
+    try:
+        components = connected_components(constraint_graph)
+        stats["components"] = len(components)
+        for position, component in enumerate(components):
+            part = solve(component, set(solution.values()), {})
+            if part is None:
+                if not solution or solve(component, set(), {}) is None:
+                    return {"status": "unsat", "solution": None, "deepest": solution, "stats": stats}
+                # Only the words of the previous regions are in the way, search them jointly
+                stats["fallbacks"] += 1
+                joint = [var for previous in components[:position + 1] for var in previous]
+                part = run_search(restrict_csp(csp, joint, set(), {}))
+                if part is None:
+                    return {"status": "unsat", "solution": None, "deepest": solution, "stats": stats}
+                solution = {}
+            solution.update(part)
+    except _Stopped as stopped:
+        return {"status": stopped.status, "solution": None, "deepest": solution, "stats": stats}
+    return {"status": "solved", "solution": solution, "deepest": solution, "stats": stats}
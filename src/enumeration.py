@@ -0,0 +1,211 @@
+import hashlib
+import time
+
+import numpy as np
+
+from backtracking import select_unassigned_variable
+from compiled import compile_puzzle
+from consistent import consistent_ids
+from heuristics import order_domain_values_simple
+from ordering import VariableOrdering
+from propagation import PROPAGATION_MODES, LiveDomains, ac3, forward_check, propagate
+from state import SearchState
+
+def iter_solutions(csp, limit=None, index=None, propagation="forward", tie_break="degree",
+                   value_ordering=order_domain_values_simple, puzzle=None):
+    """
+    Enumerate the solutions of a CSP, yielding each one as soon as it is found.
+
+    The search runs on the same explicit stack as ``search``. When a complete
+    assignment is reached it is yielded and the search simply moves on to the
+    next value, so earlier solutions are never kept.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        limit (int, optional): Stop after this many solutions.
+        index (WordIndex, optional): Word index built from the dictionary.
+        propagation (str, optional): One of ``PROPAGATION_MODES``.
+        tie_break (str, optional): Variable ranking, ``"degree"`` (MRV, ties
+            broken by degree) or ``"wdeg"`` (dom/wdeg), see ``VariableOrdering``.
+        value_ordering (callable, optional): Value ordering heuristic.
+        puzzle (CompiledPuzzle, optional): The CSP already compiled.
+
+    Yields:
+        dict: The solutions, as ``{var: value}`` assignments.
+    """
+    if propagation not in PROPAGATION_MODES:
+        raise ValueError(f"Unknown propagation mode: {propagation}")
+    if limit is not None and limit <= 0:
+        return
+    if puzzle is None:
+        puzzle = compile_puzzle(csp, index)
+    live = LiveDomains(puzzle.domain_masks)
+    if propagation in ("ac3", "mac") and not ac3(puzzle, live):
+        return
+    if len(csp) == 0:
+        yield {}
+        return
+
+    ordering = VariableOrdering(puzzle, live, tie_break)
+    assignment = SearchState(puzzle)
+    word_ids = puzzle.index.ids
+    assigned = set()
+    stack = []
+    found = 0
+    expand = True
+    while True:
+        if expand:
+            var = select_unassigned_variable(assignment, csp, puzzle, ordering)
+            var_id = puzzle.var_ids[var]
+            values = value_ordering(var, assignment, csp, puzzle, live.masks)
+            stack.append([var_id, values, -1, live.mark()])
+            ordering.assign(var_id)
+            assigned.add(var_id)
+
+        # Advance to the next value that survives propagation, backtracking as needed
+        while stack:
+            frame = stack[-1]
+            var_id, values, position, mark = frame
+            if position >= 0:
+                live.undo(mark)
+                assignment.unassign(var_id)
+            position += 1
+            frame[2] = position
+            if position == len(values):
+                stack.pop()
+                ordering.unassign(var_id)
+                assigned.discard(var_id)
+                continue
+            value = values[position]
+            assignment.assign(var_id, word_ids[puzzle.lengths[var_id]][value])
+            if propagate(var_id, value, assigned, puzzle, live, propagation):
+                break
+            ordering.record_wipeout(*live.wipeout)
+        else:
+            return
+
+        expand = len(assignment) < len(csp)
+        if not expand:
+            yield assignment.to_dict()
+            found += 1
+            if limit is not None and found >= limit:
+                return
+
+def _components(var_ids, puzzle, live):
+    """
+    Split unassigned variables into groups that can be counted independently.
+
+    Two variables interact if they cross, or if they have the same length and
+    their live domains share a word, since a word is used at most once.
+    """
+    var_ids = sorted(var_ids)
+    parent = {var_id: var_id for var_id in var_ids}
+
+    def find(var_id):
+        while parent[var_id] != var_id:
+            parent[var_id] = parent[parent[var_id]]
+            var_id = parent[var_id]
+        return var_id
+
+    for position, var_id in enumerate(var_ids):
+        for other_id in puzzle.neighbors[var_id]:
+            if other_id in parent:
+                parent[find(other_id)] = find(var_id)
+        for other_id in var_ids[position + 1:]:
+            if puzzle.lengths[other_id] == puzzle.lengths[var_id] \
+                    and (live.masks[var_id] & live.masks[other_id]).any():
+                parent[find(other_id)] = find(var_id)
+
+    groups = {}
+    for var_id in var_ids:
+        groups.setdefault(find(var_id), []).append(var_id)
+    return list(groups.values())
+
+def count_solutions(csp, index=None, stats=None, cache_size=100000, timeout_s=None, puzzle=None):
+    """
+    Count the solutions of a CSP without enumerating them one by one.
+
+    The count is a backtracking search with forward checking, so that the live
+    domains of the unassigned variables always account for every assigned
+    one. Whenever the unassigned variables fall apart into groups that
+    neither cross nor can share a word, each group is counted on its own and
+    the counts are multiplied. Group counts are cached by the group and a
+    128-bit digest of its live domains, so a sub-grid reached again through
+    different assignments is only counted once, and every cache entry has
+    the same small size whatever the dictionary.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary.
+        stats (dict, optional): Filled with the ``nodes`` expanded, the
+            number of ``splits`` into independent groups and the
+            ``cache_hits`` and ``cache_size`` of the group cache.
+        cache_size (int, optional): Maximum number of cached group counts.
+        timeout_s (float, optional): Give up after this many seconds.
+        puzzle (CompiledPuzzle, optional): The CSP already compiled.
+
+    Returns:
+        int: The number of solutions.
+
+    Raises:
+        TimeoutError: If the count takes longer than ``timeout_s``.
+    """
+    if puzzle is None:
+        puzzle = compile_puzzle(csp, index)
+    if stats is None:
+        stats = {}
+    stats.update(nodes=0, splits=0, cache_hits=0, cache_size=0)
+    deadline = None if timeout_s is None else time.time() + timeout_s
+
+    live = LiveDomains(puzzle.domain_masks)
+    assignment = SearchState(puzzle)
+    index = puzzle.index
+    assigned = set()
+    cache = {}
+
+    def count_group(group):
+        digest = hashlib.blake2b(digest_size=16)
+        for var_id in group:
+            digest.update(np.packbits(live.masks[var_id]).tobytes())
+        key = (tuple(group), digest.digest())
+        if key in cache:
+            stats["cache_hits"] += 1
+            return cache[key]
+
+        stats["nodes"] += 1
+        if deadline is not None and time.time() >= deadline:
+            raise TimeoutError("Counting the solutions took longer than the time budget")
+        var_id = min(group, key=lambda other_id: live.counts[other_id])
+        rest = [other_id for other_id in group if other_id != var_id]
+        length = puzzle.lengths[var_id]
+
+        total = 0
+        assigned.add(var_id)
+        for word_id in consistent_ids(var_id, assignment, puzzle, live.masks):
+            mark = live.mark()
+            assignment.assign(var_id, word_id)
+            if forward_check(var_id, index.words[length][word_id], assigned, puzzle, live):
+                total += count(rest)
+            live.undo(mark)
+            assignment.unassign(var_id)
+        assigned.discard(var_id)
+
+        if len(cache) < cache_size:
+            cache[key] = total
+            stats["cache_size"] = len(cache)
+        return total
+
+    def count(var_ids):
+        if not var_ids:
+            return 1
+        groups = _components(var_ids, puzzle, live)
+        if len(groups) > 1:
+            stats["splits"] += 1
+        total = 1
+        for group in groups:
+            total *= count_group(group)
+            if total == 0:
+                break
+        return total
+
+    return count(list(range(len(puzzle))))
@@ -0,0 +1,111 @@
+import numpy as np
+
+class LetterFrequencies:
+    """
+    Letter-frequency model of a compiled puzzle.
+
+    For every variable, the model counts how often each letter appears at
+    each position among the variable's live domain words, and sums those
+    counts into puzzle-wide letter frequencies. The counts are built once and
+    then kept in sync with the live domains by applying only the words that
+    left or re-entered each domain since the last refresh, so scoring a word
+    costs O(length).
+
+    Attributes:
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        positional (list): For each variable, an array of shape
+            ``(length, n_codes)`` of letter counts per position.
+        letter_counts (np.ndarray): Letter counts over every live domain.
+    """
+
+    def __init__(self, puzzle, domains=None):
+        self.puzzle = puzzle
+        self.n_codes = len(puzzle.index.alphabet) + 1
+        if domains is None:
+            domains = puzzle.domain_masks
+        self.masks = list(domains)
+        self.positional = [
+            self._count(var_id, np.flatnonzero(mask))
+            for var_id, mask in enumerate(self.masks)
+        ]
+        self.letter_counts = np.zeros(self.n_codes, dtype=np.int64)
+        for counts in self.positional:
+            self.letter_counts += counts.sum(axis=0)
+
+    def _count(self, var_id, ids):
+        length = self.puzzle.lengths[var_id]
+        letters = self.puzzle.index.matrices[length][ids]
+        flat = (np.arange(length) * self.n_codes + letters).ravel()
+        return np.bincount(flat, minlength=length * self.n_codes).reshape(length, self.n_codes)
+
+    def refresh(self, domains):
+        """
+        Bring the counts in line with the given live domains.
+
+        Only the variables whose mask changed are updated, by the difference
+        between their previous and current masks.
+
+        Args:
+            domains (list): Live domain masks, indexed by variable id.
+        """
+        for var_id, mask in enumerate(domains):
+            previous = self.masks[var_id]
+            if mask is previous:
+                continue
+            removed = self._count(var_id, np.flatnonzero(previous & ~mask))
+            added = self._count(var_id, np.flatnonzero(mask & ~previous))
+            delta = added - removed
+            self.positional[var_id] += delta
+            self.letter_counts += delta.sum(axis=0)
+            self.masks[var_id] = mask
+
+    def score(self, var_id, word):
+        """
+        Score a word by the frequency of each of its letters at its position.
+
+        Args:
+            var_id (int): The variable id.
+            word (str): The word to evaluate.
+
+        Returns:
+            int: Frequency score.
+        """
+        codes = self.puzzle.index.codes
+        counts = self.positional[var_id]
+        return int(sum(counts[position, codes.get(letter, 0)] for position, letter in enumerate(word)))
+
+    def scores(self, var_id, ids):
+        """
+        Vectorized ``score`` over word ids of the variable's length.
+
+        Args:
+            var_id (int): The variable id.
+            ids (np.ndarray): Word ids.
+
+        Returns:
+            np.ndarray: Frequency scores.
+        """
+        length = self.puzzle.lengths[var_id]
+        letters = self.puzzle.index.matrices[length][ids]
+        return self.positional[var_id][np.arange(length), letters].sum(axis=1)
+
+    def letter_score(self, word):
+        """
+        Score a word by the puzzle-wide frequency of its letters.
+        """
+        codes = self.puzzle.index.codes
+        return int(sum(self.letter_counts[codes.get(letter, 0)] for letter in word))
+
+def letter_frequencies(puzzle):
+    """
+    Get the letter-frequency model of a compiled puzzle, building it on first use.
+
+    Args:
+        puzzle (CompiledPuzzle): The compiled puzzle.
+
+    Returns:
+        LetterFrequencies: The model, cached on the puzzle.
+    """
+    if puzzle.frequencies is None:
+        puzzle.frequencies = LetterFrequencies(puzzle)
+    return puzzle.frequencies
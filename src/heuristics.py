@@ -1,4 +1,10 @@
-def order_domain_values_simple(var, assignment, csp):
+import numpy as np
+
+from consistent import consistent_ids, consistent_mask, consistent_values
+from frequency import letter_frequencies
+from state import SearchState
+
+def order_domain_values_simple(var, assignment, csp, puzzle=None, domains=None):
     """
     Order domain values using the least constraining value heuristic.
 
@@ -6,19 +12,26 @@ def order_domain_values_simple(var, assignment, csp):
         var (str): The variable to assign.
         assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle, optional): Precompiled crossing table.
+        domains (list, optional): Live domain masks maintained by propagation.
 
     Returns:
         list: Ordered list of domain values.
     """
+    if puzzle is not None:
+        # The filtered values already agree with every assigned crossing, so
+        # count_conflicts would be zero for all of them
+        return consistent_values(var, assignment, puzzle, domains)
+
     values = csp[var]["domain"]
     
     # Remove the values that have been already assigned
     values = [value for value in values if value not in assignment.values()]
     
     # Return the values ordered by the number of conflicts, highest to lowest
-    return sorted(values, key=lambda value: count_conflicts(var, value, assignment, csp), reverse=True)
+    return sorted(values, key=lambda value: count_conflicts(var, value, assignment, csp, puzzle), reverse=True)
 
-def count_conflicts(var, value, assignment, csp):
+def count_conflicts(var, value, assignment, csp, puzzle=None):
     """
     Count the number of conflicts a value has with existing assignments.
 
@@ -27,11 +40,21 @@ def count_conflicts(var, value, assignment, csp):
         value (str): The value to assign.
         assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle, optional): Precompiled crossing table. When given,
+            only the crossings of ``var`` are inspected.
 
     Returns:
         int: Number of conflicts.
     """
     conflicts = 0
+    if puzzle is not None:
+        variables = puzzle.variables
+        for idx_var, other_id, idx_other in puzzle.crossings_of[puzzle.var_ids[var]]:
+            other_value = assignment.get(variables[other_id])
+            if other_value is not None and value[idx_var] != other_value[idx_other]:
+                conflicts += 1
+        return conflicts
+
     for other_var in csp:
         if other_var in assignment and other_var != var:
             other_value = assignment[other_var]
@@ -43,7 +66,7 @@ def count_conflicts(var, value, assignment, csp):
                     conflicts += 1
     return conflicts
 
-def order_domain_values(var, assignment, csp):
+def order_domain_values(var, assignment, csp, puzzle=None, domains=None):
     """
     Order domain values using a combination of least constraining value,
     frequency heuristic, and overlap heuristic.
@@ -52,10 +75,24 @@ def order_domain_values(var, assignment, csp):
         var (str): The variable to assign.
         assignment (dict): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle, optional): Precompiled puzzle used to pre-filter
+            the domain against the assigned crossings and to score values with
+            its cached letter-frequency model.
+        domains (list, optional): Live domain masks maintained by propagation.
 
     Returns:
         list: Ordered list of domain values.
     """
+    if puzzle is not None:
+        # The overlap heuristic only depends on the variable's cells, so it is
+        # the same for every value and cannot change the order
+        var_id = puzzle.var_ids[var]
+        candidates = consistent_ids(var_id, assignment, puzzle, domains)
+        frequencies = letter_frequencies(puzzle)
+        frequencies.refresh(puzzle.domain_masks if domains is None else domains)
+        order = np.argsort(-frequencies.scores(var_id, candidates), kind="stable")
+        return puzzle.index.lookup(puzzle.lengths[var_id], candidates[order])
+
     values = csp[var]["domain"]
 
     # Remove the values that have been already assigned
@@ -67,19 +104,68 @@ def order_domain_values(var, assignment, csp):
         -overlap_heuristic(var, value, assignment, csp)
     ))
 
-def frequency_heuristic(word, csp):
+def order_domain_values_lcv(var, assignment, csp, puzzle=None, domains=None):
+    """
+    Order domain values with a vectorized least constraining value heuristic.
+
+    Each candidate is scored by the number of values it leaves to the
+    unassigned crossing neighbors. For every crossing, a histogram of the
+    neighbor's consistent letters at the crossing cell is computed once, and
+    the candidates' letters are looked up in it through the ``uint8`` letter
+    matrix, so the whole domain is scored with a few NumPy operations.
+
+    Args:
+        var (str): The variable to assign.
+        assignment (dict): Current assignments of variables.
+        csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle, optional): Precompiled puzzle. Falls back to
+            ``order_domain_values_simple`` when omitted.
+        domains (list, optional): Live domain masks maintained by propagation.
+
+    Returns:
+        list: Ordered list of domain values, least constraining first.
+    """
+    if puzzle is None:
+        return order_domain_values_simple(var, assignment, csp)
+
+    index = puzzle.index
+    var_id = puzzle.var_ids[var]
+    length = puzzle.lengths[var_id]
+    candidates = consistent_ids(var_id, assignment, puzzle, domains)
+    letters = index.matrices[length][candidates]
+    n_codes = len(index.alphabet) + 1
+
+    scores = np.zeros(len(candidates), dtype=np.int64)
+    for idx_var, other_id, idx_other in puzzle.crossings_of[var_id]:
+        if puzzle.variables[other_id] in assignment:
+            continue
+        other_mask = consistent_mask(other_id, assignment, puzzle, domains)
+        other_letters = index.matrices[puzzle.lengths[other_id]][other_mask, idx_other]
+        histogram = np.bincount(other_letters, minlength=n_codes)
+        scores += histogram[letters[:, idx_var]]
+
+    order = np.argsort(-scores, kind="stable")
+    return index.lookup(length, candidates[order])
+
+def frequency_heuristic(word, csp, frequencies=None):
     """
     Calculate a frequency heuristic score for a word based on letter frequency in the puzzle.
 
     Args:
         word (str): The word to evaluate.
         csp (dict): The constraint satisfaction problem.
+        frequencies (LetterFrequencies, optional): Cached letter-frequency model
+            of the puzzle. When given, the word is scored in O(length) by the
+            puzzle-wide frequency of its letters.
 
     Returns:
         int: Frequency score.
     """
-    puzzle_letters = [letter for var in csp for word_option in csp[var]['domain'] for letter in word_option]
-    return sum(1 for letter in word if letter.lower() in [l.lower() for l in puzzle_letters])
+    if frequencies is not None:
+        return frequencies.letter_score(word)
+
+    puzzle_letters = {letter.lower() for var in csp for word_option in csp[var]['domain'] for letter in word_option}
+    return sum(1 for letter in word if letter.lower() in puzzle_letters)
 
 def overlap_heuristic(var, value, assignment, csp):
     """
@@ -88,14 +174,18 @@ def overlap_heuristic(var, value, assignment, csp):
     Args:
         var (str): The variable being assigned.
         value (str): The value to assign.
-        assignment (dict): Current assignments of variables.
+        assignment (dict or SearchState): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
 
     Returns:
         int: Overlap score.
     """
+    if isinstance(assignment, SearchState):
+        return assignment.filled(assignment.puzzle.var_ids[var])
+
     positions = get_word_positions(var, csp)
-    overlap_count = sum(1 for position in positions if position in get_assigned_positions(assignment, csp))
+    assigned_positions = get_assigned_positions(assignment, csp)
+    overlap_count = sum(1 for position in positions if position in assigned_positions)
     return overlap_count
 
 def get_overlap_positions(var1, var2, csp):
@@ -143,12 +233,16 @@ def get_assigned_positions(assignment, csp):
     Get all positions that have been assigned in the current assignment.
 
     Args:
-        assignment (dict): Current assignments of variables.
+        assignment (dict or SearchState): Current assignments of variables.
         csp (dict): The constraint satisfaction problem.
 
     Returns:
         set: Set of assigned positions.
     """
+    if isinstance(assignment, SearchState):
+        rows, cols = np.nonzero(assignment.refcount)
+        return set(zip(rows.tolist(), cols.tolist()))
+
     positions = set()
     for var, value in assignment.items():
         direction = csp[var]["direction"]
@@ -0,0 +1,191 @@
+import time
+
+import numpy as np
+
+from backtracking import search
+from consistent import get_word_positions
+from constraint_graph import create_constraint_graph
+from csp import bucket_words, find_slots
+from decomposition import restrict_csp
+from word_index import build_word_index
+
+def apply_diff(crossword, csp, diff, words, buckets=None):
+    """
+    Apply an edit to a grid and its CSP without converting the grid again.
+
+    The edit is a dict with any of the keys:
+
+    - ``"cells"``: ``(row, col, value)`` triples setting grid cells, with the
+      values of the grid (-1 for a black square, 0 for an open cell and the
+      clue number for a numbered cell).
+    - ``"remove"``: slots dropped from the CSP, as with ``del_list``.
+    - ``"unpin"``: slots whose domain goes back to the whole word list.
+    - ``"pin"``: slot -> candidate words, as with ``prior_knowledge``.
+
+    They are applied in that order. Only the slots whose cells change are
+    rebuilt; every other entry of ``csp`` is reused as is, and slots that were
+    removed stay removed.
+
+    Args:
+        crossword (np.array): The crossword puzzle grid.
+        csp (dict): The CSP of the grid, as returned by ``puzzle2csp``.
+        diff (dict): The edit.
+        words (list): List of possible words.
+        buckets (dict, optional): Words bucketed by ``bucket_words``, reused
+            instead of bucketing ``words`` again.
+
+    Returns:
+        tuple: The edited grid and its CSP. Neither input is modified.
+    """
+    crossword = np.asarray(crossword)
+    csp = dict(csp)
+    if buckets is None and (diff.get("cells") or diff.get("unpin")):
+        buckets = bucket_words(words)
+
+    if diff.get("cells"):
+        previous_slots = {
+            f"{number}{direction}": (position, length)
+            for number, direction, position, length in find_slots(crossword)
+        }
+        crossword = crossword.copy()
+        for row, col, value in diff["cells"]:
+            crossword[row, col] = value
+
+        edited = {}
+        for number, direction, position, length in find_slots(crossword):
+            var = f"{number}{direction}"
+            if previous_slots.get(var) == (position, length):
+                # Unchanged slot, kept as is or kept removed
+                if var in csp:
+                    edited[var] = csp[var]
+                continue
+            domain = buckets.get(length)
+            if domain:
+                edited[var] = {
+                    "starting_position": position,
+                    "length": length,
+                    "direction": direction,
+                    "domain": domain
+                }
+        csp = edited
+
+    for var in diff.get("remove", ()):
+        csp.pop(var, None)
+
+    for var in diff.get("unpin", ()):
+        if var in csp:
+            csp[var] = dict(csp[var], domain=buckets.get(csp[var]["length"], []))
+
+    for var, values in diff.get("pin", {}).items():
+        if var in csp:
+            csp[var] = dict(csp[var], domain=[values] if isinstance(values, str) else list(values))
+
+    return crossword, csp
+
+def _kept_words(csp, solution, positions):
+    """
+    Words of a previous solution that are still valid in the edited CSP.
+
+    A word is kept if its slot still exists, its domain still allows it, no
+    other slot took it already and every crossing slot agrees with it.
+    """
+    allowed = {}
+    kept = {}
+    for var, slot in csp.items():
+        word = solution.get(var)
+        if word is None or len(word) != slot["length"] or word in kept.values():
+            continue
+        key = id(slot["domain"])
+        if key not in allowed:
+            allowed[key] = set(slot["domain"])
+        if word in allowed[key]:
+            kept[var] = word
+
+    letters = {}
+    for var, word in kept.items():
+        for position, letter in zip(positions[var], word):
+            letters.setdefault(position, {}).setdefault(letter, []).append(var)
+    for by_letter in letters.values():
+        if len(by_letter) > 1:
+            for conflicting in by_letter.values():
+                for var in conflicting:
+                    kept.pop(var, None)
+    return kept
+
+def repair(csp, solution, index=None, max_nodes=2000, timeout_s=None, **config):
+    """
+    Repair a previous solution after its CSP was edited, e.g. by ``apply_diff``.
+
+    The words of the previous solution that are still valid are kept. The
+    slots left without a word are re-searched with every other word fixed:
+    their domains are narrowed to the letters of the fixed crossings and the
+    fixed words are excluded, so the search only spans the edited area. When
+    that fails, or exceeds ``max_nodes``, the slots crossing the searched ones
+    are released too and the search starts again, one ring of crossings
+    further each time. Once the rings stop growing, the whole grid is
+    searched from scratch.
+
+    Args:
+        csp (dict): The edited CSP.
+        solution (dict): The previous solution.
+        index (WordIndex, optional): Word index built from the dictionary.
+            Passing one avoids indexing the domains again on every edit.
+        max_nodes (int, optional): Node budget of every neighborhood search.
+        timeout_s (float, optional): Time budget of the whole repair.
+        **config: Search options, see ``search``.
+
+    Returns:
+        dict: The result with keys ``status`` (as returned by ``search``),
+        ``solution`` and ``stats``. The stats hold the summed ``nodes``, the
+        number of ``kept`` words, the ``radius`` of the last neighborhood
+        searched (None when the whole grid was) and the number of
+        ``repaired`` slots it held.
+    """
+    deadline = None if timeout_s is None else time.time() + timeout_s
+    if index is None:
+        domains = {id(slot["domain"]): slot["domain"] for slot in csp.values()}
+        index = build_word_index(word for domain in domains.values() for word in domain)
+    order = {var: position for position, var in enumerate(csp)}
+    positions = {var: get_word_positions(var, csp) for var in csp}
+    constraint_graph = create_constraint_graph(csp)
+
+    kept = _kept_words(csp, solution, positions)
+    stats = {"nodes": 0, "kept": len(kept), "radius": 0, "repaired": len(csp) - len(kept)}
+    region = set(csp) - set(kept)
+    if not region:
+        return {"status": "solved", "solution": {var: kept[var] for var in csp}, "stats": stats}
+
+    while True:
+        remaining = None
+        if deadline is not None:
+            remaining = max(deadline - time.time(), 0.0)
+        frontier = {neighbor for var in region for neighbor in constraint_graph[var]} - region
+        full = stats["radius"] > 0 and not frontier
+        if full:
+            region = set(csp)
+            stats["radius"] = None
+        stats["repaired"] = len(region)
+
+        fixed = {var: word for var, word in kept.items() if var not in region}
+        fixed_cells = {
+            position: letter
+            for var, word in fixed.items()
+            for position, letter in zip(positions[var], word)
+        }
+        letters = {}
+        for var in region:
+            for idx, position in enumerate(positions[var]):
+                if position in fixed_cells:
+                    letters.setdefault(var, []).append((idx, fixed_cells[position]))
+        sub_csp = restrict_csp(csp, sorted(region, key=order.get), set(fixed.values()), letters)
+
+        result = search(sub_csp, index=index, max_nodes=None if full else max_nodes,
+                        timeout_s=remaining, **config)
+        stats["nodes"] += result["stats"]["nodes"]
+        if result["status"] == "solved":
+            solved = {**fixed, **result["solution"]}
+            return {"status": "solved", "solution": {var: solved[var] for var in csp}, "stats": stats}
+        if full or result["status"] not in ("unsat", "node_limit"):
+            return {"status": result["status"], "solution": None, "stats": stats}
+        region |= frontier
+        stats["radius"] += 1
@@ -0,0 +1,113 @@
+import cProfile
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+PROFILE_MODES = ("cprofile", "sample")
+
+@contextmanager
+def timed(stats, phase):
+    """
+    Time a phase of a solve, adding its duration to ``stats["time_<phase>_s"]``.
+
+    Args:
+        stats (dict): The stats to update.
+        phase (str): The phase name, e.g. ``"csp"`` or ``"graph"``.
+    """
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        key = f"time_{phase}_s"
+        stats[key] = stats.get(key, 0.0) + time.perf_counter() - start_time
+
+def record_duration(histogram, seconds):
+    """
+    Count a duration in a histogram with power-of-two microsecond buckets.
+
+    Args:
+        histogram (dict): Upper bound of the bucket in microseconds, as a
+            string so that the histogram serializes to JSON -> count.
+        seconds (float): The duration.
+    """
+    bound = 1
+    microseconds = seconds * 1e6
+    while bound < microseconds:
+        bound *= 2
+    histogram[str(bound)] = histogram.get(str(bound), 0) + 1
+
+def _function_name(filename, line, name):
+    return f"{filename}:{line}({name})"
+
+@contextmanager
+def profiled(stats, mode="cprofile", output_path=None, top=20, interval_s=0.001):
+    """
+    Profile the enclosed code, storing its hottest functions in ``stats["profile"]``.
+
+    ``"cprofile"`` traces every call with ``cProfile``, which is exact but
+    slows pure Python code down noticeably. ``"sample"`` polls the stack of
+    the profiled thread every ``interval_s`` from a background thread, which
+    is cheap enough for production solves.
+
+    Args:
+        stats (dict): The stats to update.
+        mode (str, optional): One of ``PROFILE_MODES``.
+        output_path (str, optional): With ``"cprofile"``, file the raw
+            profile is dumped to, to be opened with ``pstats`` or snakeviz.
+        top (int, optional): Number of functions kept in ``stats["profile"]``.
+        interval_s (float, optional): Sampling interval of ``"sample"``.
+    """
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {mode}")
+
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            if output_path is not None:
+                profiler.dump_stats(output_path)
+            entries = pstats.Stats(profiler).stats
+            hottest = sorted(entries.items(), key=lambda item: item[1][3], reverse=True)[:top]
+            stats["profile"] = [
+                {
+                    "function": _function_name(*function),
+                    "calls": calls,
+                    "total_s": total_s,
+                    "cumulative_s": cumulative_s
+                }
+                for function, (_, calls, total_s, cumulative_s, _) in hottest
+            ]
+        return
+
+    thread_id = threading.get_ident()
+    samples = Counter()
+    done = threading.Event()
+
+    def sample():
+        while not done.wait(interval_s):
+            frame = sys._current_frames().get(thread_id)
+            # Count every function on the stack once, giving inclusive samples
+            seen = set()
+            while frame is not None:
+                code = frame.f_code
+                seen.add(_function_name(code.co_filename, code.co_firstlineno, code.co_name))
+                frame = frame.f_back
+            samples.update(seen)
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield
+    finally:
+        done.set()
+        sampler.join()
+        stats["profile"] = [
+            {"function": function, "samples": count}
+            for function, count in samples.most_common(top)
+        ]
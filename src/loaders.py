@@ -0,0 +1,307 @@
+import json
+import os
+import sys
+import zipfile
+from xml.etree import ElementTree
+
+import numpy as np
+
+from csp import find_slots
+
+# XML namespaces of the workbook parts
+SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+RELATIONSHIP_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PACKAGE_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+# Tokens of the compact text format besides plain integers
+TEXT_TOKENS = {"#": -1, ".": 0}
+# Maximum number of cells listed in a validation problem
+MAX_LISTED_CELLS = 10
+
+def _listed(cells):
+    listed = ", ".join(str(cell) for cell in cells[:MAX_LISTED_CELLS])
+    if len(cells) > MAX_LISTED_CELLS:
+        listed += f" and {len(cells) - MAX_LISTED_CELLS} more"
+    return listed
+
+def grid_problems(crossword):
+    """
+    Check a grid before it is converted with ``puzzle2csp``.
+
+    Args:
+        crossword (np.array): The crossword puzzle grid.
+
+    Returns:
+        list: Messages describing the problems found, empty if the grid is
+        valid. A grid must be a 2-D integer array whose values are -1 (black
+        square), 0 (open cell) or a clue number used once. Every numbered
+        cell must start a slot, and every open cell must belong to one, since
+        nothing would ever fill it otherwise.
+    """
+    try:
+        crossword = np.asarray(crossword)
+    except ValueError:
+        return ["The grid must be a 2-D array of integers"]
+    if crossword.ndim != 2 or not np.issubdtype(crossword.dtype, np.integer):
+        return ["The grid must be a 2-D array of integers"]
+
+    problems = []
+    below = [tuple(cell) for cell in np.argwhere(crossword < -1).tolist()]
+    if below:
+        problems.append(f"Cells {_listed(below)} hold values below -1")
+    numbers, counts = np.unique(crossword[crossword > 0], return_counts=True)
+    if (counts > 1).any():
+        problems.append(f"Numbers {_listed(numbers[counts > 1].tolist())} are used by several cells")
+
+    covered = np.zeros(crossword.shape, dtype=bool)
+    starts = set()
+    for _, direction, (row, col), length in find_slots(crossword):
+        starts.add((row, col))
+        if direction == "across":
+            covered[row, col:col + length] = True
+        else:
+            covered[row:row + length, col] = True
+    unused = [tuple(cell) for cell in np.argwhere(crossword > 0).tolist() if tuple(cell) not in starts]
+    if unused:
+        problems.append(f"Numbered cells {_listed(unused)} start no slot")
+    unreachable = [tuple(cell) for cell in np.argwhere((crossword >= 0) & ~covered).tolist()]
+    if unreachable:
+        problems.append(f"Open cells {_listed(unreachable)} belong to no slot")
+    return problems
+
+def read_jsonl(filepath):
+    """
+    Stream puzzle records from a JSONL file.
+
+    Each line holds a JSON object with a ``grid`` (the crossword grid as a
+    list of rows) and optionally an ``id``, a ``del_list`` and
+    ``prior_knowledge`` as accepted by ``puzzle2csp``, and a ``timeout_s``
+    overriding the batch default. Records without an ``id`` are numbered by
+    line. Blank lines are skipped. A line that does not hold a JSON object
+    yields an error record, numbered by line, with ``status`` ``"error"`` and
+    an ``error`` message, so that it fails on its own instead of ending the
+    stream.
+
+    Args:
+        filepath (str): Path to the JSONL file, ``-`` for standard input.
+
+    Yields:
+        dict: The puzzle records.
+    """
+    file = sys.stdin if filepath == "-" else open(filepath, "r")
+    try:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as error:
+                yield {"id": line_number, "status": "error", "error": f"Invalid JSON: {error}"}
+                continue
+            if not isinstance(record, dict):
+                yield {"id": line_number, "status": "error", "error": "The line does not hold a JSON object"}
+                continue
+            record.setdefault("id", line_number)
+            yield record
+    finally:
+        if file is not sys.stdin:
+            file.close()
+
+def read_text(filepath):
+    """
+    Stream grids from a compact text file.
+
+    Grids are separated by blank lines, one grid row per line. Cells are
+    separated by spaces or commas and written as ``#`` for a black square,
+    ``.`` for an open cell or as integers. Lines starting with ``;`` are
+    comments; the first comment of a grid names it, otherwise grids are
+    numbered from 1::
+
+        ; small
+        1 . 2 . 3
+        # # . # .
+
+    Args:
+        filepath (str): Path to the text file.
+
+    Yields:
+        dict: Puzzle records with an ``id`` and a ``grid``.
+
+    Raises:
+        ValueError: If a cell is not a valid token or the rows of a grid
+            differ in length.
+    """
+    def record(name, rows, line_number):
+        if any(len(row) != len(rows[0]) for row in rows):
+            raise ValueError(f"{filepath}:{line_number}: the rows of grid {name} differ in length")
+        return {"id": name, "grid": np.array(rows, dtype=np.int64)}
+
+    count = 0
+    name = None
+    rows = []
+    with open(filepath, "r") as file:
+        for line_number, line in enumerate(file, start=1):
+            line = line.strip()
+            if line.startswith(";"):
+                if name is None and not rows:
+                    name = line[1:].strip() or None
+                continue
+            if not line:
+                if rows:
+                    count += 1
+                    yield record(name or count, rows, line_number)
+                name = None
+                rows = []
+                continue
+            try:
+                rows.append([
+                    TEXT_TOKENS[token] if token in TEXT_TOKENS else int(token)
+                    for token in line.replace(",", " ").split()
+                ])
+            except ValueError:
+                raise ValueError(f"{filepath}:{line_number}: invalid cell in {line!r}") from None
+        if rows:
+            yield record(name or count + 1, rows, line_number)
+
+def _cell_position(reference):
+    letters = reference.rstrip("0123456789")
+    col = 0
+    for letter in letters:
+        col = col * 26 + ord(letter) - ord("A") + 1
+    return int(reference[len(letters):]) - 1, col - 1
+
+def _sheet_cells(file):
+    """
+    Stream the cells holding a value out of a worksheet.
+
+    Returns:
+        dict: ``(row, col)`` -> number, or None for cells holding text.
+    """
+    cells = {}
+    for _, element in ElementTree.iterparse(file):
+        if element.tag != SHEET_NS + "c":
+            continue
+        value = element.find(SHEET_NS + "v")
+        if value is not None or element.find(SHEET_NS + "is") is not None:
+            number = None
+            if element.get("t", "n") == "n" and value is not None:
+                number = float(value.text)
+            cells[_cell_position(element.get("r"))] = number
+        element.clear()
+    return cells
+
+def _first_block(cells, name):
+    """
+    The grid of a worksheet: the block of numbers nearest to its top left.
+
+    The block spans the consecutive non-empty columns from the leftmost
+    column holding a number, and the consecutive rows holding numbers in
+    those columns, so a solution laid out beside the grid is left out.
+    """
+    numbers = [position for position, number in cells.items() if number is not None]
+    if not numbers:
+        return None
+    occupied_cols = {col for _, col in cells}
+    first_col = min(col for _, col in numbers)
+    last_col = first_col
+    while last_col + 1 in occupied_cols:
+        last_col += 1
+    block_rows = {row for row, col in numbers if first_col <= col <= last_col}
+    first_row = min(block_rows)
+    last_row = first_row
+    while last_row + 1 in block_rows:
+        last_row += 1
+
+    grid = np.empty((last_row - first_row + 1, last_col - first_col + 1), dtype=np.int64)
+    for row in range(first_row, last_row + 1):
+        for col in range(first_col, last_col + 1):
+            number = cells.get((row, col))
+            if number is None or number != int(number):
+                raise ValueError(f"Sheet {name}: cell ({row + 1}, {col + 1}) of the grid is not an integer")
+            grid[row - first_row, col - first_col] = int(number)
+    return grid
+
+def read_workbook(filepath):
+    """
+    Stream grids from an Excel workbook such as ``puzzles_matrices.xlsx``.
+
+    Every worksheet holds one grid, the block of integer cells nearest to
+    its top left corner; anything laid out beside it, such as a solution,
+    is ignored, and sheets without numbers are skipped. The workbook is read
+    with the standard library, one sheet at a time.
+
+    Args:
+        filepath (str): Path to the ``.xlsx`` file.
+
+    Yields:
+        dict: Puzzle records with the sheet name as ``id`` and a ``grid``.
+
+    Raises:
+        ValueError: If a grid holds a cell that is not an integer.
+    """
+    with zipfile.ZipFile(filepath) as workbook:
+        relationships = ElementTree.fromstring(workbook.read("xl/_rels/workbook.xml.rels"))
+        targets = {
+            relationship.get("Id"): relationship.get("Target")
+            for relationship in relationships.iter(PACKAGE_NS + "Relationship")
+        }
+        sheets = ElementTree.fromstring(workbook.read("xl/workbook.xml")).iter(SHEET_NS + "sheet")
+        for sheet in list(sheets):
+            name = sheet.get("name")
+            target = targets[sheet.get(RELATIONSHIP_NS + "id")]
+            path = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+            with workbook.open(path) as file:
+                grid = _first_block(_sheet_cells(file), name)
+            if grid is not None:
+                yield {"id": name, "grid": grid}
+
+# Readers by file extension, text being the default
+READERS = {".jsonl": read_jsonl, ".xlsx": read_workbook}
+
+def read_directory(dirpath):
+    """
+    Stream grids from every file of a directory, in name order.
+
+    Files are read according to their extension (see ``READERS``), hidden
+    files are skipped. Record ids are prefixed with the file name.
+
+    Args:
+        dirpath (str): Path to the directory.
+
+    Yields:
+        dict: The puzzle records.
+    """
+    for filename in sorted(os.listdir(dirpath)):
+        filepath = os.path.join(dirpath, filename)
+        if filename.startswith(".") or not os.path.isfile(filepath):
+            continue
+        for record in load_grids(filepath, validate=False):
+            record["id"] = f"{filename}:{record['id']}"
+            yield record
+
+def load_grids(path, validate=True):
+    """
+    Stream puzzle records from a file or a directory of files.
+
+    JSONL files (and ``-`` for standard input), Excel workbooks, compact
+    text files and directories are all read lazily, one record at a time,
+    so inputs of any size can be fed to ``batch.batch_solve``.
+
+    Args:
+        path (str): Path to the input.
+        validate (bool, optional): Check every grid with ``grid_problems``.
+
+    Yields:
+        dict: The puzzle records, with the ``problems`` found in their grid
+        when validated. Records without a grid, such as the error records of
+        ``read_jsonl``, are not validated.
+    """
+    if os.path.isdir(path):
+        records = read_directory(path)
+    elif path == "-":
+        records = read_jsonl(path)
+    else:
+        records = READERS.get(os.path.splitext(path)[1].lower(), read_text)(path)
+    for record in records:
+        if validate and "grid" in record:
+            record["problems"] = grid_problems(record["grid"])
+        yield record
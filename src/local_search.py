@@ -0,0 +1,231 @@
+import time
+
+import numpy as np
+
+from compiled import compile_puzzle
+
+def min_conflicts(csp, index=None, timeout_s=None, max_steps=None, tabu_tenure=10, restart_after=5000,
+                  noise=0.3, seed=None, progress=None, progress_every=1000, puzzle=None):
+    """
+    Min-conflicts local search with a tabu list and random restarts.
+
+    The search starts from a complete random fill, drawing every slot's word
+    from its domain, and repeatedly reassigns the slot with the most
+    conflicts to the word of its domain giving the fewest. A conflict is a
+    crossing cell whose two letters differ, or a word used by more than one
+    slot. Conflicts are kept per crossing cell, using the crossing geometry
+    compiled in ``CompiledPuzzle.crossings``, and only the cells of the
+    reassigned slot are updated at each step.
+
+    With probability ``noise``, any conflicted slot is reassigned instead of
+    the most conflicted one, which gets the search out of plateaus. A word a
+    slot just left stays forbidden to it for ``tabu_tenure`` steps,
+    unless taking it would solve the grid. When the fewest conflicts seen
+    since the last restart do not improve for ``restart_after`` steps, the
+    search restarts from a new random fill.
+
+    Unlike ``search``, the search is incomplete: beyond a slot with an empty
+    domain, it never proves a grid unsatisfiable, so it needs a ``timeout_s``
+    or ``max_steps`` to end on such grids.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary.
+        timeout_s (float, optional): Stop after this many seconds.
+        max_steps (int, optional): Stop after this many reassignments.
+        tabu_tenure (int, optional): Steps during which a word left by a slot
+            is forbidden to it.
+        restart_after (int, optional): Steps without improvement before a
+            restart.
+        noise (float, optional): Probability of a random walk step.
+        seed (int, optional): Seed of the random fills and tie-breaks.
+        progress (callable, optional): Called every ``progress_every`` steps
+            with a dict holding the ``steps``, ``restarts``, current
+            ``conflicts``, ``best_conflicts`` and ``elapsed_s``.
+        progress_every (int, optional): Progress interval in steps.
+        puzzle (CompiledPuzzle, optional): The CSP already compiled.
+
+    Returns:
+        dict: The result with keys ``status`` (``"solved"``, ``"unsat"`` when
+        a slot has an empty domain, ``"step_limit"`` or ``"timeout"``),
+        ``solution`` (the assignment or None), ``best`` (the complete fill
+        with the fewest conflicts found, None when unsat) and ``stats``
+        (the ``steps``, ``restarts``, ``best_conflicts`` and the
+        ``time_compile_s`` and ``time_search_s`` phase timings).
+    """
+    start_time = time.perf_counter()
+    if puzzle is None:
+        puzzle = compile_puzzle(csp, index)
+    compile_s = time.perf_counter() - start_time
+    search_start = time.perf_counter()
+    deadline = None if timeout_s is None else time.time() + timeout_s
+    rng = np.random.default_rng(seed)
+    index = puzzle.index
+    n_vars = len(puzzle)
+    stats = {"steps": 0, "restarts": 0, "best_conflicts": None, "time_compile_s": compile_s}
+
+    # Crossings incident to each variable: (crossing, own index, other variable, other index)
+    incident = [[] for _ in range(n_vars)]
+    for crossing, (var_i, idx_i, var_j, idx_j) in enumerate(puzzle.crossings):
+        incident[var_i].append((crossing, idx_i, var_j, idx_j))
+        incident[var_j].append((crossing, idx_j, var_i, idx_i))
+    # Letter matrix of each domain, shared between the variables of a shared domain
+    domain_letters = {}
+    for var_id, ids in enumerate(puzzle.domain_ids):
+        if id(ids) not in domain_letters:
+            domain_letters[id(ids)] = index.matrices[puzzle.lengths[var_id]][ids]
+
+    values = [0] * n_vars
+    letters = [None] * n_vars
+    mismatched = np.zeros(len(puzzle.crossings), dtype=bool)
+    mismatches = np.zeros(n_vars, dtype=np.int64)
+    duplicated = np.zeros(n_vars, dtype=np.int64)
+    holders = {}
+    totals = {"mismatches": 0, "duplicates": 0}
+    tabu = [{} for _ in range(n_vars)]
+
+    def set_holders(key):
+        for holder in holders.get(key, ()):
+            duplicated[holder] = len(holders[key]) > 1
+
+    def assign(var_id, word_id):
+        length = puzzle.lengths[var_id]
+        old_key = (length, values[var_id])
+        if var_id in holders.get(old_key, ()):
+            holders[old_key].discard(var_id)
+            if holders[old_key]:
+                totals["duplicates"] -= 1
+            duplicated[var_id] = 0
+            set_holders(old_key)
+        values[var_id] = word_id
+        letters[var_id] = index.matrices[length][word_id].tolist()
+        new_key = (length, word_id)
+        if holders.setdefault(new_key, set()):
+            totals["duplicates"] += 1
+        holders[new_key].add(var_id)
+        set_holders(new_key)
+
+        for crossing, idx, other_id, other_idx in incident[var_id]:
+            if letters[other_id] is None:
+                continue
+            conflict = letters[var_id][idx] != letters[other_id][other_idx]
+            if conflict != mismatched[crossing]:
+                mismatched[crossing] = conflict
+                change = 1 if conflict else -1
+                mismatches[var_id] += change
+                mismatches[other_id] += change
+                totals["mismatches"] += change
+
+    def random_fill():
+        values[:] = [0] * n_vars
+        letters[:] = [None] * n_vars
+        mismatched[:] = False
+        mismatches[:] = 0
+        duplicated[:] = 0
+        holders.clear()
+        totals.update(mismatches=0, duplicates=0)
+        for var_id, ids in enumerate(puzzle.domain_ids):
+            assign(var_id, ids[rng.integers(len(ids))])
+        for var_tabu in tabu:
+            var_tabu.clear()
+
+    def costs(var_id):
+        # Conflicts the variable would have with each word of its domain
+        ids = puzzle.domain_ids[var_id]
+        matrix = domain_letters[id(ids)]
+        cost = np.zeros(len(ids), dtype=np.int64)
+        for _, idx, other_id, other_idx in incident[var_id]:
+            cost += matrix[:, idx] != letters[other_id][other_idx]
+        length = puzzle.lengths[var_id]
+        used = [
+            values[other_id] for other_id in range(n_vars)
+            if other_id != var_id and puzzle.lengths[other_id] == length
+        ]
+        if used:
+            cost += np.isin(ids, used)
+        return ids, cost
+
+    def report():
+        if progress is not None:
+            progress({
+                "steps": stats["steps"],
+                "restarts": stats["restarts"],
+                "conflicts": totals["mismatches"] + totals["duplicates"],
+                "best_conflicts": stats["best_conflicts"],
+                "elapsed_s": time.perf_counter() - search_start
+            })
+
+    def result(status):
+        stats["time_search_s"] = time.perf_counter() - search_start
+        report()
+        return {
+            "status": status,
+            "solution": best if status == "solved" else None,
+            "best": best,
+            "stats": stats
+        }
+
+    if n_vars == 0:
+        best = {}
+        stats["best_conflicts"] = 0
+        return result("solved")
+
+    best = None
+    # Nothing to fill an empty domain with, e.g. a wrong-length prior knowledge word
+    if any(len(ids) == 0 for ids in puzzle.domain_ids):
+        return result("unsat")
+
+    random_fill()
+    run_best = None
+    since_improvement = 0
+    while True:
+        total = totals["mismatches"] + totals["duplicates"]
+        if stats["best_conflicts"] is None or total < stats["best_conflicts"]:
+            stats["best_conflicts"] = total
+            best = {
+                var: index.words[puzzle.lengths[var_id]][values[var_id]]
+                for var_id, var in enumerate(puzzle.variables)
+            }
+        if total == 0:
+            return result("solved")
+        if run_best is None or total < run_best:
+            run_best = total
+            since_improvement = 0
+        else:
+            since_improvement += 1
+        if since_improvement > restart_after:
+            stats["restarts"] += 1
+            random_fill()
+            run_best = None
+            continue
+
+        if max_steps is not None and stats["steps"] >= max_steps:
+            return result("step_limit")
+        if deadline is not None and time.time() >= deadline:
+            return result("timeout")
+        if progress_every and stats["steps"] % progress_every == 0 and stats["steps"]:
+            report()
+        stats["steps"] += 1
+
+        # Most conflicted slot, ties broken randomly, or any conflicted slot with probability noise
+        conflicts = mismatches + duplicated
+        if rng.random() < noise:
+            candidates = np.flatnonzero(conflicts)
+        else:
+            candidates = np.flatnonzero(conflicts == conflicts.max())
+        var_id = int(candidates[rng.integers(len(candidates))])
+
+        ids, cost = costs(var_id)
+        tabu[var_id] = {word_id: until for word_id, until in tabu[var_id].items() if until >= stats["steps"]}
+        forbidden = [values[var_id], *tabu[var_id]]
+        # A tabu word is still allowed when it solves the grid
+        others = total - conflicts[var_id]
+        blocked = np.isin(ids, forbidden) & (cost + others > 0)
+        if blocked.all():
+            continue
+        cost = np.where(blocked, np.iinfo(np.int64).max, cost)
+        choices = np.flatnonzero(cost == cost.min())
+        word_id = int(ids[choices[rng.integers(len(choices))]])
+
+        tabu[var_id][values[var_id]] = stats["steps"] + tabu_tenure
+        assign(var_id, word_id)
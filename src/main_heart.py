@@ -1,16 +1,19 @@
 import numpy as np
 import json
 import time
-import matplotlib.pyplot as plt
-import networkx as nx
+import argparse
 
 from csp import puzzle2csp
 from constraint_graph import create_constraint_graph
+from visualization import plot_constraint_graph
 from backtracking import backtracking_search
+from instrumentation import timed
+from utils import export_stats
+from solution_cache import SolutionCache, dictionary_fingerprint, puzzle_key
 
 from crossword import load_words, define_crossword_heart
 
-def main():
+def main(plot=True, cache_path=None):
     # Task 2.2: Heart Puzzle
 
     # Define the heart-shaped crossword puzzle
@@ -22,40 +25,53 @@ def main():
     # Add prior knowledge: '34across' is assigned "jms"
     prior_knowledge = {"34across": ["JMS"]}
 
+    stats = {}
+
     # Generate CSP with prior knowledge
-    csp_heart = puzzle2csp(crossword_heart, words_large, prior_knowledge=prior_knowledge)
+    with timed(stats, "csp"):
+        csp_heart = puzzle2csp(crossword_heart, words_large, prior_knowledge=prior_knowledge)
     for var in csp_heart:
         print(var, csp_heart[var])
 
     # Create constraint graph
-    constraint_graph_heart = create_constraint_graph(csp_heart)
+    with timed(stats, "graph"):
+        constraint_graph_heart = create_constraint_graph(csp_heart)
 
     # Plot the constraint graph
-    fig, ax = plt.subplots(figsize=(14, 14))
-    pos_heart = nx.circular_layout(constraint_graph_heart)
-    nx.draw_networkx(
-        constraint_graph_heart,
-        pos_heart,
-        with_labels=True,
-        font_weight='light',
-        node_color=[len(constraint_graph_heart[node]) for node in constraint_graph_heart],
-        cmap=plt.cm.coolwarm,
-        font_color='black',
-        node_size=500,
-        font_size=8
-    )
-    plt.title('Constraint Graph - Heart Crossword Puzzle')
-    plt.show()
-
-    # Perform backtracking search
+    if plot:
+        plot_constraint_graph(
+            constraint_graph_heart,
+            'Constraint Graph - Heart Crossword Puzzle',
+            figsize=(14, 14)
+        )
+
+    # Perform backtracking search, unless a previous run already solved the puzzle
     start_time = time.time()
-    solution_heart = backtracking_search(csp_heart)
+    cache = None if cache_path is None else SolutionCache(cache_path)
+    entry = None
+    if cache is not None:
+        key = puzzle_key(crossword_heart, dictionary_fingerprint(words_large), prior_knowledge=prior_knowledge)
+        entry = cache.get(key)
+    if entry is not None:
+        solution_heart = entry["solution"]
+        # Search stats of the run that solved it, next to this run's timings
+        stats = {**entry["stats"], **stats}
+        stats["cached"] = True
+    else:
+        solution_heart = backtracking_search(csp_heart, stats=stats)
+        if cache is not None:
+            cache.put(key, "solved" if solution_heart is not None else "unsat", solution_heart, stats)
     print(solution_heart)
     print(f"Execution time: {time.time() - start_time} seconds")
 
     # Export the solution to a text file
     with open('solutions/solution_heart.txt', 'w') as file:
         file.write(json.dumps(solution_heart))
+    export_stats(stats, 'solutions/solution_heart.txt')
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Solve the heart crossword puzzle.")
+    parser.add_argument("--no-plot", action="store_true", help="Skip plotting the constraint graph")
+    parser.add_argument("--cache", help="SQLite file caching the solution across runs")
+    args = parser.parse_args()
+    main(plot=not args.no_plot, cache_path=args.cache)
@@ -1,16 +1,19 @@
 import numpy as np
 import json
 import time
-import matplotlib.pyplot as plt
-import networkx as nx
+import argparse
 
 from csp import puzzle2csp
 from constraint_graph import create_constraint_graph
+from visualization import plot_constraint_graph
 from backtracking import backtracking_search, select_unassigned_variable
+from instrumentation import timed
+from utils import export_stats
+from solution_cache import SolutionCache, dictionary_fingerprint, puzzle_key
 
 from crossword import load_words, define_crossword_large
 
-def main():
+def main(plot=True, cache_path=None):
     # Task 2: Larger Puzzle
 
     # Import list of words to be used in the crossword puzzle from data/Words.txt
@@ -20,40 +23,53 @@ def main():
     # Define the large crossword puzzle
     crossword_large = define_crossword_large()
 
+    stats = {}
+
     # Generate CSP
-    csp_large = puzzle2csp(crossword_large, words_large)
+    with timed(stats, "csp"):
+        csp_large = puzzle2csp(crossword_large, words_large)
     for var in csp_large:
         print(var, csp_large[var])
 
     # Create constraint graph
-    constraint_graph_large = create_constraint_graph(csp_large)
+    with timed(stats, "graph"):
+        constraint_graph_large = create_constraint_graph(csp_large)
 
     # Plot the constraint graph
-    fig, ax = plt.subplots(figsize=(6, 6))
-    pos_large = nx.circular_layout(constraint_graph_large)
-    nx.draw_networkx(
-        constraint_graph_large,
-        pos_large,
-        with_labels=True,
-        font_weight='light',
-        node_color=[len(constraint_graph_large[node]) for node in constraint_graph_large],
-        cmap=plt.cm.coolwarm,
-        font_color='black',
-        node_size=500,
-        font_size=8
-    )
-    plt.title('Constraint Graph - Large Crossword Puzzle')
-    plt.show()
-
-    # Perform backtracking search
+    if plot:
+        plot_constraint_graph(
+            constraint_graph_large,
+            'Constraint Graph - Large Crossword Puzzle',
+            figsize=(6, 6)
+        )
+
+    # Perform backtracking search, unless a previous run already solved the puzzle
     start_time = time.time()
-    solution_large = backtracking_search(csp_large)
+    cache = None if cache_path is None else SolutionCache(cache_path)
+    entry = None
+    if cache is not None:
+        key = puzzle_key(crossword_large, dictionary_fingerprint(words_large))
+        entry = cache.get(key)
+    if entry is not None:
+        solution_large = entry["solution"]
+        # Search stats of the run that solved it, next to this run's timings
+        stats = {**entry["stats"], **stats}
+        stats["cached"] = True
+    else:
+        solution_large = backtracking_search(csp_large, stats=stats)
+        if cache is not None:
+            cache.put(key, "solved" if solution_large is not None else "unsat", solution_large, stats)
     print(solution_large)
     print(f"Execution time: {time.time() - start_time} seconds")
 
     # Export the solution to a text file
     with open('solutions/solution_large.txt', 'w') as file:
         file.write(json.dumps(solution_large))
+    export_stats(stats, 'solutions/solution_large.txt')
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Solve the large crossword puzzle.")
+    parser.add_argument("--no-plot", action="store_true", help="Skip plotting the constraint graph")
+    parser.add_argument("--cache", help="SQLite file caching the solution across runs")
+    args = parser.parse_args()
+    main(plot=not args.no_plot, cache_path=args.cache)
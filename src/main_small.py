@@ -1,14 +1,17 @@
 import numpy as np
 import json
 import time
-import matplotlib.pyplot as plt
-import networkx as nx
+import argparse
 
 from csp import puzzle2csp
 from constraint_graph import create_constraint_graph
+from visualization import plot_constraint_graph
 from backtracking import backtracking_search
+from instrumentation import timed
+from utils import export_stats
+from solution_cache import SolutionCache, dictionary_fingerprint, puzzle_key
 
-def main():
+def main(plot=True, cache_path=None):
     # Task 1: Backtracking (30 pts)
 
     # Create a list of words to be used in the crossword puzzle
@@ -24,40 +27,53 @@ def main():
         [0, -1, -1, 0, -1]
     ])
 
+    stats = {}
+
     # Generate CSP
-    csp_small = puzzle2csp(crossword_small, words_small, del_list=["2across"])
+    with timed(stats, "csp"):
+        csp_small = puzzle2csp(crossword_small, words_small, del_list=["2across"])
     for var in csp_small:
         print(var, csp_small[var])
 
     # Create constraint graph
-    constraint_graph_small = create_constraint_graph(csp_small)
+    with timed(stats, "graph"):
+        constraint_graph_small = create_constraint_graph(csp_small)
 
     # Plot the constraint graph
-    fig, ax = plt.subplots(figsize=(5, 5))
-    pos_small = nx.circular_layout(constraint_graph_small)
-    nx.draw_networkx(
-        constraint_graph_small,
-        pos_small,
-        with_labels=True,
-        font_weight='light',
-        node_color=[len(constraint_graph_small[node]) for node in constraint_graph_small],
-        cmap=plt.cm.coolwarm,
-        font_color='black',
-        node_size=500,
-        font_size=8
-    )
-    plt.title('Constraint Graph - Small Crossword Puzzle')
-    plt.show()
-
-    # Perform backtracking search
+    if plot:
+        plot_constraint_graph(
+            constraint_graph_small,
+            'Constraint Graph - Small Crossword Puzzle',
+            figsize=(5, 5)
+        )
+
+    # Perform backtracking search, unless a previous run already solved the puzzle
     start_time = time.time()
-    solution = backtracking_search(csp_small)
+    cache = None if cache_path is None else SolutionCache(cache_path)
+    entry = None
+    if cache is not None:
+        key = puzzle_key(crossword_small, dictionary_fingerprint(words_small), del_list=["2across"])
+        entry = cache.get(key)
+    if entry is not None:
+        solution = entry["solution"]
+        # Search stats of the run that solved it, next to this run's timings
+        stats = {**entry["stats"], **stats}
+        stats["cached"] = True
+    else:
+        solution = backtracking_search(csp_small, stats=stats)
+        if cache is not None:
+            cache.put(key, "solved" if solution is not None else "unsat", solution, stats)
     print(solution)
     print(f"Execution time: {time.time() - start_time} seconds")
 
     # Export the solution to a text file
     with open('solutions/solution_small.txt', 'w') as file:
         file.write(json.dumps(solution))
+    export_stats(stats, 'solutions/solution_small.txt')
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Solve the small crossword puzzle.")
+    parser.add_argument("--no-plot", action="store_true", help="Skip plotting the constraint graph")
+    parser.add_argument("--cache", help="SQLite file caching the solution across runs")
+    args = parser.parse_args()
+    main(plot=not args.no_plot, cache_path=args.cache)
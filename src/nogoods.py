@@ -0,0 +1,67 @@
+from collections import OrderedDict
+
+class NogoodStore:
+    """
+    Bounded store of learned nogoods.
+
+    A nogood is a partial assignment, stored as a frozenset of
+    ``(var, value)`` pairs, that cannot be extended to a solution. Nogoods
+    are hashed by content and indexed by each of their pairs, so checking a
+    candidate value only looks at the nogoods mentioning it. When the store is
+    full, the oldest nogood is evicted.
+
+    Attributes:
+        max_size (int): Maximum number of nogoods kept.
+        hits (int): Number of candidate values rejected by a nogood.
+        evictions (int): Number of nogoods evicted.
+    """
+
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.nogoods = OrderedDict()
+        self.by_pair = {}
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.nogoods)
+
+    def add(self, pairs):
+        """
+        Learn a nogood.
+
+        Args:
+            pairs (iterable): ``(var, value)`` pairs of the nogood.
+        """
+        nogood = frozenset(pairs)
+        if not nogood or nogood in self.nogoods or self.max_size <= 0:
+            return
+        if len(self.nogoods) >= self.max_size:
+            evicted, _ = self.nogoods.popitem(last=False)
+            for pair in evicted:
+                self.by_pair[pair].discard(evicted)
+                if not self.by_pair[pair]:
+                    del self.by_pair[pair]
+            self.evictions += 1
+        self.nogoods[nogood] = None
+        for pair in nogood:
+            self.by_pair.setdefault(pair, set()).add(nogood)
+
+    def check(self, var, value, assignment):
+        """
+        Find a nogood violated by assigning ``value`` to ``var``.
+
+        Args:
+            var (str): The variable being assigned.
+            value (str): The candidate value.
+            assignment (dict): Current assignments of variables.
+
+        Returns:
+            frozenset or None: The violated nogood, None if the value is allowed.
+        """
+        for nogood in self.by_pair.get((var, value), ()):
+            if all(other == var or assignment.get(other) == other_value
+                   for other, other_value in nogood):
+                self.hits += 1
+                return nogood
+        return None
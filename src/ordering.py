@@ -0,0 +1,88 @@
+import numpy as np
+
+TIE_BREAKS = ("degree", "wdeg")
+
+class VariableOrdering:
+    """
+    Dynamic Minimum Remaining Values (MRV) variable ordering.
+
+    The remaining-value counts are read from the live domains, which update
+    them incrementally on every assignment and backtrack: from the pruned
+    domains when the search propagates, and from ``count_check`` when it
+    does not. The next variable is picked with a linear argmin over those
+    counts, so no sorting happens at each node.
+
+    With ``tie_break="degree"``, the variable with the fewest live values is
+    picked and ties are broken by the degree heuristic (most crossing
+    neighbors). With ``tie_break="wdeg"``, the dom/wdeg heuristic is used
+    instead: the variable with the smallest ratio of live values to weighted
+    degree towards unassigned neighbors is picked, where every crossing
+    starts with weight 1 and gains 1 each time it causes a domain wipe-out,
+    and ties are broken by degree. Without propagation there are no
+    wipe-outs, so the weights stay at 1 and the ratio is taken over the
+    number of unassigned neighbors (dom/ddeg). Remaining ties are broken by
+    variable id, or randomly when a ``seed`` is given.
+
+    Attributes:
+        live (LiveDomains): The live domains of the search.
+        unassigned (np.ndarray): Boolean mask of the unassigned variables.
+        degree (np.ndarray): Number of crossing neighbors of each variable.
+        weights (np.ndarray): Variable-by-variable constraint weights.
+        tie_break (str): One of ``TIE_BREAKS``.
+    """
+
+    def __init__(self, puzzle, live, tie_break="degree", seed=None):
+        if tie_break not in TIE_BREAKS:
+            raise ValueError(f"Unknown tie break: {tie_break}")
+        n_vars = len(puzzle)
+        self.live = live
+        self.unassigned = np.ones(n_vars, dtype=bool)
+        self.degree = np.array([len(neighbors) for neighbors in puzzle.neighbors], dtype=np.int64)
+        self.weights = np.zeros((n_vars, n_vars), dtype=np.int64)
+        for var_id, neighbors in enumerate(puzzle.neighbors):
+            self.weights[var_id, neighbors] = 1
+        self.tie_break = tie_break
+        self.noise = None if seed is None else np.random.default_rng(seed).random(n_vars)
+
+    def assign(self, var_id):
+        self.unassigned[var_id] = False
+
+    def unassign(self, var_id):
+        self.unassigned[var_id] = True
+
+    def record_wipeout(self, var_id, culprit_id):
+        """
+        Increase the weight of the constraint between a wiped out variable and its culprit.
+        """
+        if culprit_id is None or culprit_id == var_id:
+            return
+        self.weights[var_id, culprit_id] += 1
+        self.weights[culprit_id, var_id] += 1
+
+    def select(self):
+        """
+        Select the unassigned variable with the fewest live values, or the
+        smallest dom/wdeg ratio.
+
+        Returns:
+            int or None: The selected variable id, None if every variable is assigned.
+        """
+        candidates = np.flatnonzero(self.unassigned)
+        if len(candidates) == 0:
+            return None
+
+        counts = self.live.counts[candidates]
+        if self.tie_break == "wdeg":
+            # A variable without unassigned neighbors is ranked by its count alone
+            scores = counts / np.maximum(self.weights[candidates] @ self.unassigned, 1)
+        else:
+            scores = counts
+        candidates = candidates[scores == scores.min()]
+
+        if len(candidates) > 1:
+            degrees = self.degree[candidates]
+            candidates = candidates[degrees == degrees.max()]
+
+        if len(candidates) > 1 and self.noise is not None:
+            return int(candidates[np.argmin(self.noise[candidates])])
+        return int(candidates[0])
@@ -0,0 +1,83 @@
+from collections import OrderedDict
+
+class PatternCache:
+    """
+    Bounded LRU cache of pattern queries on a word index.
+
+    Keys are ``(length, pattern)`` pairs, where ``pattern`` holds the letter
+    codes of a partially filled slot (0 for empty cells) as bytes, and values
+    are the boolean masks of the words matching the pattern. When the cache is
+    full, the least recently used entry is evicted.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept.
+        hits (int): Number of lookups answered from the cache.
+        misses (int): Number of lookups not found in the cache.
+        evictions (int): Number of entries evicted.
+    """
+
+    def __init__(self, max_size=4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """
+        Look an entry up, marking it as recently used.
+
+        Args:
+            key (tuple): The ``(length, pattern)`` key.
+
+        Returns:
+            np.ndarray or None: The cached mask, None if missing.
+        """
+        mask = self.entries.get(key)
+        if mask is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return mask
+
+    def put(self, key, mask):
+        """
+        Store an entry, evicting the least recently used one if the cache is full.
+
+        Args:
+            key (tuple): The ``(length, pattern)`` key.
+            mask (np.ndarray): The mask of the matching words.
+        """
+        if self.max_size <= 0:
+            return
+        if key not in self.entries and len(self.entries) >= self.max_size:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+        self.entries[key] = mask
+        self.entries.move_to_end(key)
+
+    def discard_length(self, length):
+        """
+        Drop the entries of a length, e.g. after its index bucket was rebuilt.
+        """
+        for key in [key for key in self.entries if key[0] == length]:
+            del self.entries[key]
+
+    def clear(self):
+        """
+        Drop every entry, keeping the statistics.
+        """
+        self.entries.clear()
+
+    def stats(self):
+        """
+        Current counters of the cache.
+
+        Returns:
+            dict: ``size``, ``hits``, ``misses`` and ``evictions``.
+        """
+        return {"size": len(self), "hits": self.hits, "misses": self.misses, "evictions": self.evictions}
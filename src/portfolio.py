@@ -0,0 +1,124 @@
+import multiprocessing
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from backtracking import search
+from compiled import compile_puzzle
+from heuristics import order_domain_values_simple, order_domain_values, order_domain_values_lcv
+
+# Base configurations of the portfolio, cycled with new tie-break seeds
+BASE_CONFIGS = [
+    {"propagation": "forward", "value_ordering": order_domain_values_simple},
+    {"propagation": "mac", "value_ordering": order_domain_values_lcv},
+    {"propagation": "forward", "tie_break": "wdeg", "value_ordering": order_domain_values_lcv},
+    {"propagation": "ac3", "value_ordering": order_domain_values},
+    {"propagation": "none", "value_ordering": order_domain_values_simple},
+]
+
+# Worker globals, set once per worker process by _init_worker
+_shared = {}
+
+def portfolio_configs(n_configs):
+    """
+    Build ``n_configs`` differently configured searches.
+
+    The first configurations are ``BASE_CONFIGS`` as is; the following ones
+    repeat them with random tie-breaking seeds.
+
+    Args:
+        n_configs (int): Number of configurations.
+
+    Returns:
+        list: Keyword arguments for ``search``.
+    """
+    configs = []
+    for i in range(n_configs):
+        config = dict(BASE_CONFIGS[i % len(BASE_CONFIGS)])
+        if i >= len(BASE_CONFIGS):
+            config["seed"] = i
+        configs.append(config)
+    return configs
+
+def _init_worker(csp, puzzle, stop_event):
+    _shared["csp"] = csp
+    _shared["puzzle"] = puzzle
+    _shared["stop_event"] = stop_event
+
+def _run_config(config_id, config, timeout_s):
+    result = search(
+        _shared["csp"],
+        puzzle=_shared["puzzle"],
+        timeout_s=timeout_s,
+        should_stop=_shared["stop_event"].is_set,
+        **config
+    )
+    # The state can be large and is useless across processes
+    result["state"] = None
+    return config_id, result
+
+def pool_context():
+    """
+    Multiprocessing context for solver pools.
+
+    ``fork`` is preferred where available, so that workers inherit the
+    compiled puzzle and word index without pickling them.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context()
+
+def portfolio_search(csp, index=None, configs=None, workers=None, timeout_s=None):
+    """
+    Race differently configured searches across CPU cores.
+
+    The CSP is compiled once in the parent process. Workers receive it when
+    they start (inherited through ``fork`` on Linux, pickled once per worker
+    elsewhere), never once per task. The first search to find a solution or
+    to prove that none exists wins; the others are told to stop through a
+    shared event and the pending ones are cancelled.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary.
+        configs (list, optional): Keyword arguments for ``search``, one per
+            search. Defaults to ``portfolio_configs(workers)``.
+        workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs.
+        timeout_s (float, optional): Time budget of each search.
+
+    Returns:
+        dict: The winning ``search`` result, or the one that got deepest if
+        every search stopped early, with an extra ``config`` key holding the
+        index of its configuration.
+    """
+    workers = workers or os.cpu_count() or 1
+    if configs is None:
+        configs = portfolio_configs(workers)
+    puzzle = compile_puzzle(csp, index)
+
+    context = pool_context()
+    stop_event = context.Event()
+    best = None
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(configs)),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(csp, puzzle, stop_event)
+    ) as executor:
+        pending = {
+            executor.submit(_run_config, config_id, config, timeout_s)
+            for config_id, config in enumerate(configs)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                config_id, result = future.result()
+                result["config"] = config_id
+                if result["status"] in ("solved", "unsat"):
+                    stop_event.set()
+                    for other in pending:
+                        other.cancel()
+                    return result
+                if best is None or len(result["deepest"]) > len(best["deepest"]):
+                    best = result
+    return best
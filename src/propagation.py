@@ -0,0 +1,274 @@
+import numpy as np
+
+PROPAGATION_MODES = ("none", "forward", "ac3", "mac")
+
+class LiveDomains:
+    """
+    Live domain masks of a search, with their sizes and an undo trail.
+
+    Masks are replaced, never mutated in place, so the trail only has to keep
+    references to the previous masks.
+
+    The counts are taken from the filters, which match the masks unless the
+    search runs without propagation: ``count_check`` then narrows the filters
+    only, so that variable ordering still sees the values left by the
+    assignment while the search keeps trying every value.
+
+    Attributes:
+        masks (list): Boolean domain masks, indexed by variable id.
+        filters (list): Boolean masks the counts are taken from.
+        counts (np.ndarray): Number of live values of each variable.
+        trail (list): Undo trail of ``(var_id, previous_mask, previous_count, culprit_id,
+            previous_filter)`` entries.
+        wipeout (tuple or None): ``(var_id, culprit_id)`` of the last wiped out
+            domain and the variable whose pruning emptied it.
+    """
+
+    def __init__(self, masks):
+        self.masks = list(masks)
+        self.filters = list(masks)
+        self.counts = np.array([int(mask.sum()) for mask in self.masks], dtype=np.int64)
+        self.trail = []
+        self.wipeout = None
+
+    def prune(self, var_id, mask, culprit_id=None):
+        """
+        Replace the live domain of a variable, recording the previous one on the trail.
+
+        Args:
+            var_id (int): The variable id.
+            mask (np.ndarray): The new live domain mask.
+            culprit_id (int, optional): The variable responsible for the pruning.
+
+        Returns:
+            bool: False if the new domain is empty, True otherwise.
+        """
+        self.trail.append((var_id, self.masks[var_id], self.counts[var_id], culprit_id, self.filters[var_id]))
+        count = int(mask.sum())
+        self.masks[var_id] = mask
+        self.filters[var_id] = mask
+        self.counts[var_id] = count
+        if count == 0:
+            self.wipeout = (var_id, culprit_id)
+            return False
+        return True
+
+    def narrow(self, var_id, mask):
+        """
+        Replace the filter of a variable, and so its count, leaving its live domain untouched.
+
+        Args:
+            var_id (int): The variable id.
+            mask (np.ndarray): The new filter.
+        """
+        self.trail.append((var_id, self.masks[var_id], self.counts[var_id], None, self.filters[var_id]))
+        self.filters[var_id] = mask
+        self.counts[var_id] = int(mask.sum())
+
+    def mark(self):
+        """
+        Current trail length, to be passed to ``undo``.
+        """
+        return len(self.trail)
+
+    def undo(self, mark):
+        """
+        Restore the live domains recorded on the trail since ``mark``.
+
+        Args:
+            mark (int): Trail length to roll back to.
+        """
+        trail = self.trail
+        while len(trail) > mark:
+            var_id, mask, count, _, previous_filter = trail.pop()
+            self.masks[var_id] = mask
+            self.filters[var_id] = previous_filter
+            self.counts[var_id] = count
+
+    def pruned_by(self, var_id):
+        """
+        Variables whose prunings still shape the live domain of a variable.
+
+        Args:
+            var_id (int): The variable id.
+
+        Returns:
+            set: Culprit ids recorded on the trail for ``var_id``, excluding itself.
+        """
+        return {
+            culprit_id
+            for pruned_id, _, _, culprit_id, _ in self.trail
+            if pruned_id == var_id and culprit_id is not None and culprit_id != var_id
+        }
+
+def forward_check(var_id, value, assigned, puzzle, live):
+    """
+    Prune the neighbors of a freshly assigned variable along the crossing table.
+
+    The assigned variable's domain is reduced to its value, every unassigned
+    crossing neighbor keeps only the words with the matching letter, and
+    unassigned variables of the same length lose the value itself.
+
+    Args:
+        var_id (int): The assigned variable id.
+        value (str): The assigned value.
+        assigned (set): Ids of the assigned variables, including ``var_id``.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        live (LiveDomains): The live domains.
+
+    Returns:
+        bool: False as soon as a domain is wiped out, True otherwise.
+    """
+    index = puzzle.index
+    length = puzzle.lengths[var_id]
+    word_id = index.ids[length][value]
+
+    single = np.zeros_like(live.masks[var_id])
+    single[word_id] = True
+    live.prune(var_id, single, var_id)
+
+    for idx_var, other_id, idx_other in puzzle.crossings_of[var_id]:
+        if other_id in assigned:
+            continue
+        mask = live.masks[other_id] & index.bitset(puzzle.lengths[other_id], idx_other, value[idx_var])
+        if not live.prune(other_id, mask, var_id):
+            return False
+
+    for other_id, other_length in enumerate(puzzle.lengths):
+        if other_length == length and other_id not in assigned and live.masks[other_id][word_id]:
+            mask = live.masks[other_id].copy()
+            mask[word_id] = False
+            if not live.prune(other_id, mask, var_id):
+                return False
+    return True
+
+def count_check(var_id, value, assigned, puzzle, live):
+    """
+    Forward check a freshly assigned variable on the counts only.
+
+    The unassigned crossing neighbors and same-length variables get the
+    counts forward checking would leave them, but keep their live domains,
+    so that a search without propagation still orders its variables by the
+    values actually left to them.
+
+    Args:
+        var_id (int): The assigned variable id.
+        value (str): The assigned value.
+        assigned (set): Ids of the assigned variables, including ``var_id``.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        live (LiveDomains): The live domains.
+    """
+    index = puzzle.index
+    length = puzzle.lengths[var_id]
+    word_id = index.ids[length][value]
+
+    for idx_var, other_id, idx_other in puzzle.crossings_of[var_id]:
+        if other_id not in assigned:
+            bitset = index.bitset(puzzle.lengths[other_id], idx_other, value[idx_var])
+            live.narrow(other_id, live.filters[other_id] & bitset)
+
+    for other_id, other_length in enumerate(puzzle.lengths):
+        if other_length == length and other_id not in assigned and live.filters[other_id][word_id]:
+            mask = live.filters[other_id].copy()
+            mask[word_id] = False
+            live.narrow(other_id, mask)
+
+def revise(var_id, idx_var, other_id, idx_other, puzzle, live):
+    """
+    Make the arc ``var_id -> other_id`` consistent on one crossing cell.
+
+    Args:
+        var_id (int): The variable whose domain is revised.
+        idx_var (int): Letter index of the crossing cell in ``var_id``.
+        other_id (int): The supporting variable.
+        idx_other (int): Letter index of the crossing cell in ``other_id``.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        live (LiveDomains): The live domains.
+
+    Returns:
+        bool or None: None if nothing was pruned, otherwise whether the
+        revised domain is still non-empty.
+    """
+    index = puzzle.index
+    other_letters = index.matrices[puzzle.lengths[other_id]][:, idx_other][live.masks[other_id]]
+    support = np.zeros(len(index.alphabet) + 1, dtype=bool)
+    support[other_letters] = True
+
+    mask = live.masks[var_id] & support[index.matrices[puzzle.lengths[var_id]][:, idx_var]]
+    if np.array_equal(mask, live.masks[var_id]):
+        return None
+    return live.prune(var_id, mask, other_id)
+
+def ac3(puzzle, live, assigned=(), sources=None):
+    """
+    Enforce arc consistency over the unassigned variables with the AC-3 algorithm.
+
+    Args:
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        live (LiveDomains): The live domains.
+        assigned (set, optional): Ids of the assigned variables, never revised.
+        sources (iterable, optional): Variable ids whose domains changed. Only
+            the arcs pointing at them are queued initially. All arcs are
+            queued when omitted.
+
+    Returns:
+        bool: False if a domain is wiped out, True otherwise.
+    """
+    if sources is None:
+        sources = range(len(puzzle))
+    queue = [
+        (var_id, idx_var, source, idx_source)
+        for source in sources
+        for idx_source, var_id, idx_var in puzzle.crossings_of[source]
+        if var_id not in assigned
+    ]
+    queued = set(queue)
+
+    while queue:
+        arc = queue.pop()
+        queued.discard(arc)
+        var_id, idx_var, other_id, idx_other = arc
+        revised = revise(var_id, idx_var, other_id, idx_other, puzzle, live)
+        if revised is None:
+            continue
+        if not revised:
+            return False
+        for idx_source, neighbor_id, idx_neighbor in puzzle.crossings_of[var_id]:
+            if neighbor_id == other_id or neighbor_id in assigned:
+                continue
+            new_arc = (neighbor_id, idx_neighbor, var_id, idx_source)
+            if new_arc not in queued:
+                queue.append(new_arc)
+                queued.add(new_arc)
+    return True
+
+def propagate(var_id, value, assigned, puzzle, live, propagation):
+    """
+    Run the propagation configured for the search after an assignment.
+
+    ``"none"`` prunes nothing and only updates the counts with
+    ``count_check``. ``"forward"`` and ``"ac3"`` only forward check during the
+    search (``"ac3"`` additionally makes the root arc consistent), while
+    ``"mac"`` maintains arc consistency after every assignment.
+
+    Args:
+        var_id (int): The assigned variable id.
+        value (str): The assigned value.
+        assigned (set): Ids of the assigned variables, including ``var_id``.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        live (LiveDomains): The live domains.
+        propagation (str): One of ``PROPAGATION_MODES``.
+
+    Returns:
+        bool: False if the assignment wipes out a domain, True otherwise.
+    """
+    if propagation == "none":
+        count_check(var_id, value, assigned, puzzle, live)
+        return True
+    mark = live.mark()
+    if not forward_check(var_id, value, assigned, puzzle, live):
+        return False
+    if propagation == "mac":
+        changed = {entry[0] for entry in live.trail[mark:]}
+        return ac3(puzzle, live, assigned, changed)
+    return True
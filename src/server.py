@@ -0,0 +1,301 @@
+import argparse
+import asyncio
+import http.client
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from http import HTTPStatus
+
+from batch import _init_worker, _run_record, _worker_initargs
+from crossword import load_words
+from portfolio import pool_context
+from word_index import build_word_index, load_word_index
+
+# Extra time granted to a request on top of its search budget, covering the CSP
+# construction and the round trip to the worker
+GRACE_S = 5.0
+
+def _ping():
+    return os.getpid()
+
+class SolverServer:
+    """
+    Local HTTP/JSON solver server built on asyncio streams.
+
+    The word list and index are loaded once and inherited by a pool of worker
+    processes, which run the CPU-bound solves. The word list may be None when
+    an index is given, see ``batch.batch_solve``. ``POST /solve`` takes a JSON
+    puzzle record as read by ``batch.read_puzzles`` (a ``grid`` in the
+    ``define_crossword_*`` format, plus optional ``del_list``,
+    ``prior_knowledge`` and ``timeout_s``) and answers with the result record
+    of ``batch.solve_record``. ``GET /health`` reports the load of the server.
+
+    At most ``max_concurrent`` solves run at a time and at most ``max_queue``
+    more wait for a slot; further requests are refused with ``503``. Every
+    solve is bounded by its search budget, capped at ``timeout_s``, and
+    answered with ``504`` if the worker does not reply within ``GRACE_S`` more
+    seconds; its slot stays taken until the worker is done. A solve failing
+    in the worker is answered with ``500``, or with ``503`` if a worker
+    process died, in which case the pool is replaced for the next requests. With a ``cache_path``, the workers share a ``SolutionCache`` and
+    answer the puzzles solved before without searching.
+
+    Attributes:
+        host (str): The address the server listens on.
+        port (int): The port the server listens on, resolved once started if 0.
+        active (int): Number of solves running.
+        queued (int): Number of solves waiting for a slot.
+    """
+
+    def __init__(self, words, index=None, host="127.0.0.1", port=8080, workers=None,
+                 max_concurrent=None, max_queue=64, timeout_s=30.0, max_body=1 << 20, cache_path=None, **config):
+        self.words = words
+        self.index = index if index is not None else build_word_index(words)
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.max_concurrent = max_concurrent or self.workers
+        self.max_queue = max_queue
+        self.timeout_s = timeout_s
+        self.max_body = max_body
+        self.cache_path = cache_path
+        self.config = config
+        self.active = 0
+        self.queued = 0
+        self._slots = None
+        self._initargs = None
+        self._executor = None
+        self._server = None
+
+    async def start(self):
+        """
+        Start the worker pool, warm up its workers and start listening.
+        """
+        self._slots = asyncio.Semaphore(self.max_concurrent)
+        self._initargs = _worker_initargs(self.words, self.index, self.cache_path)
+        self._executor = self._new_executor()
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)))
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=pool_context(),
+            initializer=_init_worker,
+            initargs=self._initargs
+        )
+
+    def _release(self, future=None):
+        # Retrieve the outcome of an abandoned solve, so that asyncio does not report it as lost
+        if future is not None and not future.cancelled():
+            future.exception()
+        self.active -= 1
+        self._slots.release()
+
+    async def serve_forever(self):
+        """
+        Start the server if needed and serve until cancelled.
+        """
+        if self._server is None:
+            await self.start()
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.close()
+
+    async def close(self):
+        """
+        Stop listening and shut the worker pool down.
+        """
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def solve(self, record):
+        """
+        Solve a puzzle record on the worker pool.
+
+        Args:
+            record (dict): The puzzle record.
+
+        Returns:
+            tuple: The HTTP status and the JSON payload of the response.
+        """
+        if self.active + self.queued >= self.max_concurrent + self.max_queue:
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"error": "Too many pending requests"}
+
+        timeout_s = self.timeout_s
+        if record.get("timeout_s") is not None:
+            timeout_s = min(float(record["timeout_s"]), timeout_s)
+        record = dict(record, timeout_s=timeout_s)
+
+        self.queued += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.queued -= 1
+        self.active += 1
+        executor = self._executor
+        future = None
+        try:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(executor, _run_record, record, timeout_s, self.config)
+            # The slot is held until the worker is done, even past a timeout
+            future.add_done_callback(self._release)
+            result = await asyncio.wait_for(asyncio.shield(future), timeout_s + GRACE_S)
+        except asyncio.TimeoutError:
+            return HTTPStatus.GATEWAY_TIMEOUT, {"id": record.get("id"), "error": "The solve timed out"}
+        except BrokenProcessPool:
+            if self._executor is executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+            return HTTPStatus.SERVICE_UNAVAILABLE, {"id": record.get("id"), "error": "A worker process died"}
+        except Exception as error:
+            return HTTPStatus.INTERNAL_SERVER_ERROR, {
+                "id": record.get("id"),
+                "error": f"{type(error).__name__}: {error}"
+            }
+        finally:
+            if future is None:
+                self._release()
+        if result["status"] == "error":
+            return HTTPStatus.BAD_REQUEST, result
+        return HTTPStatus.OK, result
+
+    async def _route(self, method, path, body):
+        if path == "/health":
+            if method != "GET":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use GET"}
+            return HTTPStatus.OK, {"status": "ok", "active": self.active, "queued": self.queued}
+        if path == "/solve":
+            if method != "POST":
+                return HTTPStatus.METHOD_NOT_ALLOWED, {"error": "Use POST"}
+            try:
+                record = json.loads(body)
+            except ValueError as error:
+                return HTTPStatus.BAD_REQUEST, {"error": f"Invalid JSON: {error}"}
+            if not isinstance(record, dict):
+                return HTTPStatus.BAD_REQUEST, {"error": "The request body must be a JSON object"}
+            try:
+                return await self.solve(record)
+            except (TypeError, ValueError) as error:
+                return HTTPStatus.BAD_REQUEST, {"error": str(error)}
+        return HTTPStatus.NOT_FOUND, {"error": f"Unknown path {path}"}
+
+    async def _handle(self, reader, writer):
+        try:
+            status, payload = await self._read_and_route(reader)
+            body = json.dumps(payload).encode("utf-8")
+            writer.write(
+                f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n".encode("ascii") + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _read_head(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").split()
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return request_line, headers
+
+    async def _read_and_route(self, reader):
+        # readline raises ValueError on lines over the stream limit
+        try:
+            request_line, headers = await self._read_head(reader)
+        except (ValueError, asyncio.LimitOverrunError):
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request line or header too large"}
+        if len(request_line) != 3:
+            return HTTPStatus.BAD_REQUEST, {"error": "Malformed request line"}
+        method, path, _ = request_line
+
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            length = -1
+        if length < 0:
+            return HTTPStatus.BAD_REQUEST, {"error": "Invalid Content-Length"}
+        if length > self.max_body:
+            return HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"}
+        body = await reader.readexactly(length) if length else b""
+        return await self._route(method, path.split("?", 1)[0], body)
+
+def request_solve(record, host="127.0.0.1", port=8080, timeout_s=None):
+    """
+    Send a puzzle record to a running ``SolverServer``.
+
+    Args:
+        record (dict): The puzzle record.
+        host (str, optional): The server address.
+        port (int, optional): The server port.
+        timeout_s (float, optional): Socket timeout of the request.
+
+    Returns:
+        tuple: The HTTP status code and the decoded JSON response.
+    """
+    connection = http.client.HTTPConnection(host, port, timeout=timeout_s)
+    try:
+        connection.request(
+            "POST", "/solve", body=json.dumps(record), headers={"Content-Type": "application/json"}
+        )
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the crossword solver over HTTP/JSON.")
+    parser.add_argument("--words", default="data/Words.txt", help="Word list, one word per line")
+    parser.add_argument("--index", help="Binary word index built with word_index.py, used instead of --words")
+    parser.add_argument("--host", default="127.0.0.1", help="Address to listen on")
+    parser.add_argument("--port", type=int, default=8080, help="Port to listen on")
+    parser.add_argument("--workers", type=int, help="Number of worker processes")
+    parser.add_argument("--max-concurrent", type=int, help="Maximum number of solves running at a time")
+    parser.add_argument("--max-queue", type=int, default=64, help="Maximum number of solves waiting for a slot")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Maximum time budget of a solve in seconds")
+    parser.add_argument("--propagation", default="forward", help="Propagation used by the search")
+    parser.add_argument("--cache", help="SQLite file caching the solved and unsat puzzles across runs")
+    args = parser.parse_args()
+
+    if args.index is not None:
+        index = load_word_index(args.index)
+        words = None
+    else:
+        words = load_words(args.words)
+        index = build_word_index(words)
+
+    server = SolverServer(
+        words,
+        index,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        max_concurrent=args.max_concurrent,
+        max_queue=args.max_queue,
+        timeout_s=args.timeout,
+        cache_path=args.cache,
+        propagation=args.propagation
+    )
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+# Bumped whenever the key derivation changes, so that stale entries are never matched
+KEY_VERSION = 2
+# Statuses proving something about a puzzle, the only ones worth caching
+CACHED_STATUSES = ("solved", "unsat")
+
+def dictionary_fingerprint(words):
+    """
+    Fingerprint of a word list, independent of the order of its words.
+
+    Callers looking many puzzles up against the same word list should
+    compute it once and pass it to ``puzzle_key``.
+
+    Args:
+        words (list): List of words.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    return hashlib.sha256("\n".join(sorted(set(words))).encode()).hexdigest()
+
+def puzzle_key(crossword, dictionary, del_list=(), prior_knowledge={}, config=None):
+    """
+    Canonical key of a puzzle and the solver configuration solving it.
+
+    The key covers the grid (its shape and cell values), the deleted slots
+    taken as a set, the prior knowledge with its candidate words in order,
+    since they become the domain order, the dictionary fingerprint
+    and the search options. Options that are functions, such as value
+    orderings, are keyed by name. Limits such as ``timeout_s`` do not change
+    a solved or unsat outcome and should be left out of ``config``.
+
+    Args:
+        crossword (np.array): The crossword puzzle grid.
+        dictionary (str): Fingerprint of the word list, see ``dictionary_fingerprint``.
+        del_list (list, optional): Variables deleted from the CSP.
+        prior_knowledge (dict, optional): Pre-assigned values for certain variables.
+        config (dict, optional): Search options, see ``search``.
+
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+
+    Raises:
+        TypeError: If a prior knowledge value is not a list or tuple of words.
+    """
+    for var, values in prior_knowledge.items():
+        if not isinstance(values, (list, tuple)):
+            raise TypeError(f"The prior knowledge of {var} must be a list of words, not {type(values).__name__}")
+    grid = np.ascontiguousarray(crossword, dtype=np.int64)
+    payload = {
+        "version": KEY_VERSION,
+        "shape": list(grid.shape),
+        "grid": hashlib.sha256(grid.tobytes()).hexdigest(),
+        "del_list": sorted(set(del_list)),
+        "prior_knowledge": {var: list(values) for var, values in prior_knowledge.items()},
+        "dictionary": dictionary,
+        "config": {
+            key: value.__name__ if callable(value) else value
+            for key, value in (config or {}).items()
+        }
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+class SolutionCache:
+    """
+    Persistent cache of puzzle outcomes in an SQLite database.
+
+    Entries are keyed by ``puzzle_key`` and hold a solution, or the fact that
+    an exhaustive search proved the puzzle unsatisfiable, along with the
+    stats of that search. When the cache holds more than ``max_entries``
+    entries, the least recently looked up ones are evicted.
+
+    The database runs in write-ahead logging mode, so that worker processes
+    sharing the file read concurrently and writes wait for each other instead
+    of failing. Each process opens its own connection on first use, which
+    makes the cache safe to hand to forked workers.
+
+    Attributes:
+        path (str): Path to the database file.
+        max_entries (int): Maximum number of entries kept.
+        timeout_s (float): Time a write waits for a concurrent one.
+    """
+
+    def __init__(self, path, max_entries=100000, timeout_s=30.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.timeout_s = timeout_s
+        self._connection = None
+        self._pid = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM solutions").fetchone()[0]
+
+    def _connect(self):
+        if self._connection is None or self._pid != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=self.timeout_s, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS solutions ("
+                "key TEXT PRIMARY KEY, status TEXT NOT NULL, solution TEXT, stats TEXT, "
+                "created REAL NOT NULL, accessed REAL NOT NULL)"
+            )
+            connection.execute("CREATE INDEX IF NOT EXISTS solutions_accessed ON solutions (accessed)")
+            self._connection = connection
+            self._pid = os.getpid()
+        return self._connection
+
+    def get(self, key):
+        """
+        Look a puzzle up, marking its entry as recently used.
+
+        Args:
+            key (str): The ``puzzle_key`` of the puzzle.
+
+        Returns:
+            dict or None: The ``status`` (``"solved"`` or ``"unsat"``), the
+            ``solution`` (None when unsat) and the ``stats`` of the search
+            that found it, None if the puzzle is not cached.
+        """
+        connection = self._connect()
+        row = connection.execute(
+            "SELECT status, solution, stats FROM solutions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        connection.execute("UPDATE solutions SET accessed = ? WHERE key = ?", (time.time(), key))
+        status, solution, stats = row
+        return {"status": status, "solution": json.loads(solution), "stats": json.loads(stats)}
+
+    def put(self, key, status, solution=None, stats=None):
+        """
+        Store the outcome of a puzzle, evicting the least recently used
+        entries if the cache is full.
+
+        Args:
+            key (str): The ``puzzle_key`` of the puzzle.
+            status (str): ``"solved"`` or ``"unsat"``.
+            solution (dict, optional): The solution, when solved.
+            stats (dict, optional): Stats of the search.
+
+        Raises:
+            ValueError: If the status is not in ``CACHED_STATUSES``, since an
+                interrupted search proves nothing.
+        """
+        if status not in CACHED_STATUSES:
+            raise ValueError(f"Only {' and '.join(CACHED_STATUSES)} outcomes can be cached, not {status}")
+        connection = self._connect()
+        now = time.time()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.execute(
+                "INSERT OR REPLACE INTO solutions VALUES (?, ?, ?, ?, ?, ?)",
+                (key, status, json.dumps(solution), json.dumps(stats or {}), now, now)
+            )
+            excess = connection.execute("SELECT COUNT(*) FROM solutions").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM solutions WHERE key IN "
+                    "(SELECT key FROM solutions ORDER BY accessed LIMIT ?)",
+                    (excess,)
+                )
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def clear(self):
+        """
+        Drop every entry.
+        """
+        self._connect().execute("DELETE FROM solutions")
+
+    def close(self):
+        """
+        Close the connection of this process, if open.
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
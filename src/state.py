@@ -0,0 +1,101 @@
+from collections.abc import Mapping
+
+import numpy as np
+
+class SearchState(Mapping):
+    """
+    Compact, array-backed assignment of a compiled puzzle.
+
+    The state behaves like the ``{var: value}`` assignment dict used across
+    the heuristics, but stores the chosen word id of every slot in an int
+    array, the placed letters in a ``uint8`` grid with per-cell reference
+    counts, and the used word ids per length. Assigning or unassigning a slot
+    costs O(word length), and the partial grid is always up to date.
+
+    Attributes:
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        word_ids (np.ndarray): Word id chosen for each slot, -1 if unassigned.
+        grid (np.ndarray): Letter codes of the placed letters, 0 for empty cells.
+        refcount (np.ndarray): Number of assigned slots covering each cell.
+        used (dict): Length -> set of word ids in use.
+        order (list): Assigned slot ids, in assignment order.
+    """
+
+    __slots__ = ("puzzle", "word_ids", "grid", "refcount", "used", "order")
+
+    def __init__(self, puzzle):
+        self.puzzle = puzzle
+        self.word_ids = np.full(len(puzzle), -1, dtype=np.int64)
+        self.grid = np.zeros(puzzle.shape, dtype=np.uint8)
+        self.refcount = np.zeros(puzzle.shape, dtype=np.uint8)
+        self.used = {}
+        self.order = []
+
+    def assign(self, var_id, word_id):
+        """
+        Place a word in a slot.
+
+        Args:
+            var_id (int): The slot id.
+            word_id (int): Word id within the index bucket of the slot's length.
+        """
+        length = self.puzzle.lengths[var_id]
+        cells = self.puzzle.cells[var_id]
+        self.grid.flat[cells] = self.puzzle.index.matrices[length][word_id]
+        self.refcount.flat[cells] += 1
+        self.used.setdefault(length, set()).add(word_id)
+        self.word_ids[var_id] = word_id
+        self.order.append(var_id)
+
+    def unassign(self, var_id):
+        """
+        Remove the word placed in a slot, clearing the cells no other slot covers.
+
+        Args:
+            var_id (int): The slot id.
+        """
+        cells = self.puzzle.cells[var_id]
+        self.refcount.flat[cells] -= 1
+        self.grid.flat[cells] *= self.refcount.flat[cells] > 0
+        self.used[self.puzzle.lengths[var_id]].discard(int(self.word_ids[var_id]))
+        self.word_ids[var_id] = -1
+        if self.order[-1] == var_id:
+            self.order.pop()
+        else:
+            self.order.remove(var_id)
+
+    def pattern(self, var_id):
+        """
+        Letter codes currently placed in a slot's cells, 0 where empty.
+        """
+        return self.grid.flat[self.puzzle.cells[var_id]]
+
+    def filled(self, var_id):
+        """
+        Number of a slot's cells already covered by an assigned slot.
+        """
+        return int(np.count_nonzero(self.refcount.flat[self.puzzle.cells[var_id]]))
+
+    def to_dict(self):
+        """
+        The assignment as a plain ``{var: value}`` dict, in assignment order.
+        """
+        return {var: self[var] for var in self}
+
+    def __getitem__(self, var):
+        var_id = self.puzzle.var_ids[var]
+        word_id = self.word_ids[var_id]
+        if word_id < 0:
+            raise KeyError(var)
+        return self.puzzle.index.words[self.puzzle.lengths[var_id]][word_id]
+
+    def __contains__(self, var):
+        var_id = self.puzzle.var_ids.get(var)
+        return var_id is not None and self.word_ids[var_id] >= 0
+
+    def __iter__(self):
+        variables = self.puzzle.variables
+        return (variables[var_id] for var_id in list(self.order))
+
+    def __len__(self):
+        return len(self.order)
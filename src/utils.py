@@ -1,4 +1,5 @@
 import json
+import os
 
 def export_solution(solution, filepath):
     """
@@ -9,4 +10,62 @@ def export_solution(solution, filepath):
         filepath (str): Path to the output file.
     """
     with open(filepath, 'w') as file:
-        file.write(json.dumps(solution)) 
\ No newline at end of file
+        file.write(json.dumps(solution)) 
+
+def export_search_state(state, filepath):
+    """
+    Export a search state returned by ``search`` to a JSON file.
+
+    The file is written next to its destination first and then renamed, so an
+    interrupted checkpoint never leaves a truncated state behind.
+
+    Args:
+        state (dict): The search state to export.
+        filepath (str): Path to the output file.
+    """
+    temporary = f"{filepath}.tmp"
+    with open(temporary, 'w') as file:
+        file.write(json.dumps(state))
+    os.replace(temporary, filepath)
+
+def load_search_state(filepath):
+    """
+    Load a search state exported with ``export_search_state``.
+
+    Args:
+        filepath (str): Path to the state file.
+
+    Returns:
+        dict: The search state, to be passed to ``search`` as ``resume``.
+    """
+    with open(filepath, 'r') as file:
+        return json.load(file)
+
+def write_jsonl(record, file):
+    """
+    Write a record as one line of a JSONL stream and flush it.
+
+    Args:
+        record (dict): The record to write.
+        file (file): Text file open for writing.
+    """
+    file.write(json.dumps(record) + "\n")
+    file.flush()
+
+def export_stats(stats, solution_path):
+    """
+    Export solver stats to a JSON file next to a solution file.
+
+    ``solutions/solution_large.txt`` gets ``solutions/solution_large.stats.json``.
+
+    Args:
+        stats (dict): The stats to export, e.g. filled by ``backtracking_search``.
+        solution_path (str): Path to the solution file.
+
+    Returns:
+        str: Path to the stats file.
+    """
+    filepath = f"{os.path.splitext(solution_path)[0]}.stats.json"
+    with open(filepath, 'w') as file:
+        file.write(json.dumps(stats))
+    return filepath
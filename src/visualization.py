@@ -0,0 +1,57 @@
+def to_networkx(constraint_graph):
+    """
+    Convert a constraint graph from ``create_constraint_graph`` to networkx.
+
+    networkx is imported on first use only, so the solver does not depend on it.
+
+    Args:
+        constraint_graph (dict): Mapping from each variable to its neighbors.
+
+    Returns:
+        networkx.Graph: The constraint graph.
+    """
+    import networkx as nx
+
+    graph = nx.Graph()
+    graph.add_nodes_from(constraint_graph)
+    graph.add_edges_from(
+        (var1, var2) for var1, neighbors in constraint_graph.items() for var2 in neighbors
+    )
+    return graph
+
+def plot_constraint_graph(constraint_graph, title, figsize=(6, 6), filepath=None, show=True):
+    """
+    Draw a constraint graph on a circular layout, coloring nodes by degree.
+
+    matplotlib and networkx are imported on first use only.
+
+    Args:
+        constraint_graph (dict): Mapping from each variable to its neighbors.
+        title (str): Title of the plot.
+        figsize (tuple, optional): Size of the figure in inches.
+        filepath (str, optional): File the figure is saved to.
+        show (bool, optional): Open the figure in a window.
+    """
+    import matplotlib.pyplot as plt
+    import networkx as nx
+
+    graph = to_networkx(constraint_graph)
+    fig, ax = plt.subplots(figsize=figsize)
+    nx.draw_networkx(
+        graph,
+        nx.circular_layout(graph),
+        ax=ax,
+        with_labels=True,
+        font_weight='light',
+        node_color=[len(graph[node]) for node in graph],
+        cmap=plt.cm.coolwarm,
+        font_color='black',
+        node_size=500,
+        font_size=8
+    )
+    plt.title(title)
+    if filepath is not None:
+        fig.savefig(filepath)
+    if show:
+        plt.show()
+    plt.close(fig)
@@ -0,0 +1,383 @@
+import argparse
+import json
+import mmap
+import os
+from collections import ChainMap
+from collections.abc import MutableMapping
+
+import numpy as np
+
+from crossword import load_words
+from pattern_cache import PatternCache
+
+# Leading bytes and layout version of the binary word index format
+INDEX_MAGIC = b"WORDIDX\x00"
+INDEX_VERSION = 1
+# Alignment of the data sections, so that every array starts on a cache line
+ALIGNMENT = 64
+
+class WordIndex:
+    """
+    Letter-position bitset index over a word list.
+
+    Words are bucketed by length. For every length the index keeps a letter
+    matrix of shape ``(n_words, length)`` holding letter codes, and a boolean
+    bitset array of shape ``(length, n_codes, n_words)`` where
+    ``bitsets[length][pos, code]`` marks the words having that letter at that
+    position. Pattern queries are therefore an AND of a few bitsets.
+
+    Letter code 0 is reserved for "no letter" so that code arrays can use it
+    as a wildcard. Pattern queries over code arrays are memoized in a bounded
+    LRU cache, shared by every search using the index.
+
+    Attributes:
+        alphabet (str): Characters known to the index; ``alphabet[k]`` has code ``k + 1``.
+        codes (dict): Mapping from character to letter code.
+        words (dict): Length -> list of words; the index of a word is its id.
+        ids (dict): Length -> mapping from word to id.
+        matrices (dict): Length -> ``uint8`` letter matrix.
+        bitsets (dict): Length -> boolean bitset array.
+        pattern_cache (PatternCache): Cache of ``match_pattern`` results.
+    """
+
+    def __init__(self, words=(), cache_size=4096):
+        self.alphabet = ""
+        self.codes = {}
+        self.words = {}
+        self.ids = {}
+        self.matrices = {}
+        self.bitsets = {}
+        self.pattern_cache = PatternCache(cache_size)
+        self.add_words(words)
+
+    def add_words(self, words):
+        """
+        Add words to the index, ignoring the ones already present.
+
+        Only the length buckets that received new words are rebuilt, unless
+        a new character extends the alphabet. Indexes shared by several
+        searches should be extended with ``overlay`` instead.
+
+        Args:
+            words (iterable): Words to add.
+        """
+        touched = set()
+        new_letters = set()
+        for word in words:
+            length = len(word)
+            if length == 0:
+                continue
+            bucket = self.ids.setdefault(length, {})
+            if word in bucket:
+                continue
+            bucket[word] = len(bucket)
+            self.words.setdefault(length, []).append(word)
+            touched.add(length)
+            new_letters.update(letter for letter in word if letter not in self.codes)
+
+        if new_letters:
+            self.alphabet = "".join(sorted(set(self.alphabet) | new_letters))
+            self.codes = {letter: code + 1 for code, letter in enumerate(self.alphabet)}
+            touched = set(self.words)
+            self.pattern_cache.clear()
+
+        for length in touched:
+            self._build_length(length)
+            self.pattern_cache.discard_length(length)
+
+    def overlay(self, words):
+        """
+        Index of this one's words plus the given ones, leaving this one untouched.
+
+        The buckets of the lengths receiving no word are shared with this
+        index, memory-mapped ones included. The others are private copies
+        holding the extra words after this index's ones, so word ids are kept.
+        New characters are appended to the alphabet, keeping the existing
+        letter codes. The overlay has its own pattern cache.
+
+        Args:
+            words (iterable): Words to add.
+
+        Returns:
+            WordIndex: This index if it already holds every word, otherwise
+            the overlay.
+        """
+        extra = {}
+        for word in words:
+            if word and word not in self.ids.get(len(word), {}):
+                extra.setdefault(len(word), {})[word] = None
+        if not extra:
+            return self
+
+        index = WordIndex(cache_size=self.pattern_cache.max_size)
+        new_letters = {letter for bucket in extra.values() for word in bucket for letter in word} - set(self.codes)
+        index.alphabet = self.alphabet + "".join(sorted(new_letters))
+        index.codes = {letter: code + 1 for code, letter in enumerate(index.alphabet)}
+        index.words = ChainMap({}, self.words)
+        index.ids = ChainMap({}, self.ids)
+        index.matrices = ChainMap({}, self.matrices)
+        index.bitsets = ChainMap({}, self.bitsets)
+        for length, bucket in extra.items():
+            ids = dict(self.ids.get(length, {}))
+            for word in bucket:
+                ids[word] = len(ids)
+            index.words[length] = list(self.words.get(length, [])) + list(bucket)
+            index.ids[length] = ids
+            index._build_length(length)
+        return index
+
+    def _build_length(self, length):
+        words = self.words[length]
+        matrix = np.array(
+            [[self.codes[letter] for letter in word] for word in words],
+            dtype=np.uint8
+        ).reshape(len(words), length)
+        codes = np.arange(len(self.alphabet) + 1, dtype=np.uint8)
+        self.matrices[length] = matrix
+        self.bitsets[length] = matrix.T[:, None, :] == codes[None, :, None]
+
+    def size(self, length):
+        """
+        Number of words of the given length.
+        """
+        matrix = self.matrices.get(length)
+        return 0 if matrix is None else len(matrix)
+
+    def bitset(self, length, position, letter):
+        """
+        Bitset of the words of ``length`` having ``letter`` at ``position``.
+
+        Args:
+            length (int): Word length.
+            position (int): Letter index within the word.
+            letter (str): The letter.
+
+        Returns:
+            np.ndarray: Boolean array over the word ids of that length.
+        """
+        code = self.codes.get(letter)
+        # Shared buckets of an overlay have no bitsets for the letters it added
+        if code is None or code >= self.bitsets[length].shape[1]:
+            return np.zeros(self.size(length), dtype=bool)
+        return self.bitsets[length][position, code]
+
+    def match(self, length, constraints):
+        """
+        Bitset of the words of ``length`` satisfying every ``(position, letter)`` constraint.
+
+        Args:
+            length (int): Word length.
+            constraints (iterable): ``(position, letter)`` pairs.
+
+        Returns:
+            np.ndarray: Boolean array over the word ids of that length.
+        """
+        mask = np.ones(self.size(length), dtype=bool)
+        for position, letter in constraints:
+            mask &= self.bitset(length, position, letter)
+        return mask
+
+    def match_pattern(self, length, pattern):
+        """
+        Bitset of the words of ``length`` matching a pattern of letter codes.
+
+        Results are memoized in ``pattern_cache``; the returned array is
+        shared and must not be modified.
+
+        Args:
+            length (int): Word length.
+            pattern (np.ndarray): ``uint8`` letter codes, 0 for any letter.
+
+        Returns:
+            np.ndarray: Boolean array over the word ids of that length.
+        """
+        key = (length, pattern.tobytes())
+        mask = self.pattern_cache.get(key)
+        if mask is None:
+            bitsets = self.bitsets[length]
+            positions = np.flatnonzero(pattern)
+            if len(positions) and pattern[positions].max() >= bitsets.shape[1]:
+                mask = np.zeros(self.size(length), dtype=bool)
+            elif len(positions):
+                mask = np.logical_and.reduce(bitsets[positions, pattern[positions]], axis=0)
+            else:
+                mask = np.ones(self.size(length), dtype=bool)
+            mask.flags.writeable = False
+            self.pattern_cache.put(key, mask)
+        return mask
+
+    def lookup(self, length, ids):
+        """
+        Translate word ids of the given length back into words.
+        """
+        words = self.words[length]
+        return [words[i] for i in ids]
+
+def build_word_index(words):
+    """
+    Build a ``WordIndex`` from a list of words, e.g. the output of ``load_words``.
+
+    Args:
+        words (list): List of words.
+
+    Returns:
+        WordIndex: The index.
+    """
+    return WordIndex(words)
+
+class _LazyBuckets(MutableMapping):
+    """
+    Length -> bucket mapping that builds each bucket on first access.
+
+    Used by mapped indexes, so that the word lists and word-to-id mappings of
+    a length are only decoded once a search actually needs them.
+    """
+
+    def __init__(self, build, lengths):
+        self._build = build
+        self._pending = set(lengths)
+        self._buckets = {}
+
+    def __getitem__(self, length):
+        if length in self._pending:
+            self._buckets[length] = self._build(length)
+            self._pending.discard(length)
+        return self._buckets[length]
+
+    def __setitem__(self, length, bucket):
+        self._pending.discard(length)
+        self._buckets[length] = bucket
+
+    def __delitem__(self, length):
+        if length in self._pending:
+            self._pending.discard(length)
+        else:
+            del self._buckets[length]
+
+    def __contains__(self, length):
+        return length in self._pending or length in self._buckets
+
+    def __iter__(self):
+        return iter(list(self._buckets) + sorted(self._pending))
+
+    def __len__(self):
+        return len(self._pending) + len(self._buckets)
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+def save_word_index(index, filepath):
+    """
+    Write a ``WordIndex`` to a binary file that ``load_word_index`` can map.
+
+    The file starts with ``INDEX_MAGIC``, the size of a JSON header and the
+    header itself, which holds the alphabet and the location of every section.
+    For each length follow the ``uint8`` letter matrix, the boolean bitset
+    array and the newline-separated UTF-8 words, each section aligned to
+    ``ALIGNMENT`` bytes. The file is written next to its destination first and
+    then renamed.
+
+    Args:
+        index (WordIndex): The index to save.
+        filepath (str): Path to the output file.
+    """
+    sections = []
+    lengths = {}
+    offset = 0
+    for length in sorted(index.matrices):
+        blobs = {
+            "matrix": np.ascontiguousarray(index.matrices[length]).tobytes(),
+            "bitsets": np.ascontiguousarray(index.bitsets[length]).tobytes(),
+            "words": "\n".join(index.words[length]).encode("utf-8")
+        }
+        lengths[str(length)] = {"count": index.size(length)}
+        for name, blob in blobs.items():
+            lengths[str(length)][name] = [offset, len(blob)]
+            sections.append((offset, blob))
+            offset = _aligned(offset + len(blob))
+
+    header = json.dumps({
+        "version": INDEX_VERSION,
+        "alphabet": index.alphabet,
+        "lengths": lengths
+    }).encode("utf-8")
+    preamble = INDEX_MAGIC + len(header).to_bytes(8, "little") + header
+    data_start = _aligned(len(preamble))
+
+    temporary = f"{filepath}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(preamble)
+        for section_offset, blob in sections:
+            file.seek(data_start + section_offset)
+            file.write(blob)
+        file.truncate(data_start + offset)
+    os.replace(temporary, filepath)
+
+def load_word_index(filepath):
+    """
+    Open a binary word index written by ``save_word_index``.
+
+    The file is memory-mapped read-only and the letter matrices and bitsets
+    are ``numpy.frombuffer`` views onto it, so loading copies nothing and
+    processes opening the same file share its pages. Word lists and
+    word-to-id mappings are decoded per length on first use. Adding words
+    rebuilds the touched lengths in memory, leaving the file untouched.
+
+    Args:
+        filepath (str): Path to the index file.
+
+    Returns:
+        WordIndex: The index.
+
+    Raises:
+        ValueError: If the file is not a word index or has another version.
+    """
+    with open(filepath, "rb") as file:
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if buffer[:len(INDEX_MAGIC)] != INDEX_MAGIC:
+        raise ValueError(f"{filepath} is not a word index file")
+    header_start = len(INDEX_MAGIC) + 8
+    header_size = int.from_bytes(buffer[len(INDEX_MAGIC):header_start], "little")
+    header = json.loads(buffer[header_start:header_start + header_size])
+    if header.get("version") != INDEX_VERSION:
+        raise ValueError(f"{filepath} was written with another word index version")
+    data_start = _aligned(header_start + header_size)
+
+    index = WordIndex()
+    index.alphabet = header["alphabet"]
+    index.codes = {letter: code + 1 for code, letter in enumerate(index.alphabet)}
+    n_codes = len(index.alphabet) + 1
+    sections = {int(length): section for length, section in header["lengths"].items()}
+    for length, section in sections.items():
+        count = section["count"]
+        index.matrices[length] = np.frombuffer(
+            buffer, dtype=np.uint8, count=count * length, offset=data_start + section["matrix"][0]
+        ).reshape(count, length)
+        index.bitsets[length] = np.frombuffer(
+            buffer, dtype=bool, count=length * n_codes * count, offset=data_start + section["bitsets"][0]
+        ).reshape(length, n_codes, count)
+
+    def decode_words(length):
+        start, size = sections[length]["words"]
+        return buffer[data_start + start:data_start + start + size].decode("utf-8").split("\n")
+
+    def build_ids(length):
+        words = index.words[length]
+        return dict(zip(words, range(len(words))))
+
+    index.words = _LazyBuckets(decode_words, sections)
+    index.ids = _LazyBuckets(build_ids, sections)
+    return index
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile a word list into a binary word index.")
+    parser.add_argument("words", help="Word list, one word per line")
+    parser.add_argument("output", help="Path of the binary index to write")
+    args = parser.parse_args()
+
+    index = build_word_index(load_words(args.words))
+    save_word_index(index, args.output)
+    print(f"Indexed {sum(index.size(length) for length in index.matrices)} words into {args.output}")
+
+if __name__ == "__main__":
+    main()
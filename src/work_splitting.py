@@ -0,0 +1,197 @@
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from backtracking import search
+from compiled import compile_puzzle
+from heuristics import order_domain_values_simple
+from ordering import VariableOrdering
+from portfolio import _init_worker, _shared, pool_context
+from propagation import LiveDomains, ac3, propagate
+
+def _replay(puzzle, prefix, propagation, tie_break="degree", seed=None):
+    """
+    Rebuild the live domains and variable ordering of a partial assignment.
+
+    The ordering is built with the ``tie_break`` and ``seed`` of the search
+    run on the sub-problems, so that the split follows the same variable
+    order.
+
+    Returns:
+        tuple or None: ``(live, ordering, assigned)``, or None if the prefix
+        fails propagation.
+    """
+    live = LiveDomains(puzzle.domain_masks)
+    if propagation in ("ac3", "mac") and not ac3(puzzle, live):
+        return None
+    ordering = VariableOrdering(puzzle, live, tie_break, seed)
+    assigned = set()
+    for var, value in prefix.items():
+        var_id = puzzle.var_ids[var]
+        ordering.assign(var_id)
+        assigned.add(var_id)
+        if not propagate(var_id, value, assigned, puzzle, live, propagation):
+            return None
+    return live, ordering, assigned
+
+def _expand(csp, puzzle, prefix, propagation, value_ordering, tie_break, seed):
+    """
+    Extend a prefix with every surviving value of its next variable.
+    """
+    replayed = _replay(puzzle, prefix, propagation, tie_break, seed)
+    if replayed is None:
+        return []
+    live, ordering, assigned = replayed
+    var_id = ordering.select()
+    var = puzzle.variables[var_id]
+    assigned.add(var_id)
+
+    children = []
+    for value in value_ordering(var, prefix, csp, puzzle, live.masks):
+        mark = live.mark()
+        if propagate(var_id, value, assigned, puzzle, live, propagation):
+            child = dict(prefix)
+            child[var] = value
+            children.append(child)
+        live.undo(mark)
+    return children
+
+def split_subproblems(csp, puzzle, n_subproblems, propagation="forward",
+                      value_ordering=order_domain_values_simple, max_depth=None, tie_break="degree", seed=None):
+    """
+    Split the search tree into independent sub-problems at a shallow depth.
+
+    The frontier is expanded one level at a time, each prefix on its own next
+    variable as picked by ``VariableOrdering``, until it holds at least
+    ``n_subproblems`` prefixes. Prefixes failing propagation are dropped, so
+    together the sub-problems cover exactly the part of the tree that is
+    still open.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        puzzle (CompiledPuzzle): The compiled puzzle.
+        n_subproblems (int): Minimum number of sub-problems wanted.
+        propagation (str, optional): Propagation used to prune the prefixes.
+        value_ordering (callable, optional): Value ordering heuristic.
+        max_depth (int, optional): Maximum number of variables per prefix.
+        tie_break (str, optional): Variable ranking, see ``VariableOrdering``.
+        seed (int, optional): Seed for breaking the remaining ties randomly.
+
+    Returns:
+        list: Partial assignments, one per sub-problem. Empty if the puzzle has
+        no solution, and complete assignments if the split reached the leaves.
+    """
+    if max_depth is None:
+        max_depth = len(csp)
+    frontier = [{}]
+    depth = 0
+    while frontier and len(frontier) < n_subproblems and depth < max_depth:
+        frontier = [
+            child
+            for prefix in frontier
+            for child in _expand(csp, puzzle, prefix, propagation, value_ordering, tie_break, seed)
+        ]
+        depth += 1
+        if any(len(prefix) == len(csp) for prefix in frontier):
+            break
+    if frontier == [{}] and _replay(puzzle, {}, propagation, tie_break, seed) is None:
+        return []
+    return frontier
+
+def _run_subproblem(prefix, config, deadline):
+    # Sub-problems may wait in the queue, so the budget left is computed on start
+    timeout_s = None if deadline is None else max(deadline - time.time(), 0.0)
+    result = search(
+        _shared["csp"],
+        puzzle=_shared["puzzle"],
+        prefix=prefix,
+        timeout_s=timeout_s,
+        should_stop=_shared["stop_event"].is_set,
+        **config
+    )
+    result["state"] = None
+    return result
+
+def split_search(csp, index=None, workers=None, subproblems_per_worker=8, split_depth=None,
+                 timeout_s=None, **config):
+    """
+    Exhaust the search tree in parallel by splitting it into sub-problems.
+
+    The tree is split into at least ``workers * subproblems_per_worker``
+    prefixes, which are submitted to a process pool. Idle workers pull the
+    next sub-problem from the pool's shared queue, so a worker that finishes
+    early takes more work. The first solution found stops every worker. If
+    every sub-problem is exhausted, the puzzle has no solution. The time
+    budget covers the whole search: when it runs out, the running
+    sub-problems are stopped and the queued ones cancelled.
+
+    Args:
+        csp (dict): The constraint satisfaction problem.
+        index (WordIndex, optional): Word index built from the dictionary.
+        workers (int, optional): Number of worker processes. Defaults to the
+            number of CPUs.
+        subproblems_per_worker (int, optional): Oversubscription factor used
+            to balance uneven sub-problems.
+        split_depth (int, optional): Maximum depth of the split.
+        timeout_s (float, optional): Time budget of the whole search, split
+            included.
+        **config: Search options shared by every sub-problem, see ``search``.
+
+    Returns:
+        dict: The result with keys ``status`` (``"solved"``, ``"unsat"`` or
+        ``"timeout"`` if some sub-problem stopped early), ``solution``,
+        ``deepest`` and ``stats`` (summed ``nodes`` and ``backtracks`` plus
+        the number of ``subproblems`` and ``unresolved`` ones).
+    """
+    deadline = None if timeout_s is None else time.time() + timeout_s
+    workers = workers or os.cpu_count() or 1
+    propagation = config.setdefault("propagation", "forward")
+    value_ordering = config.setdefault("value_ordering", order_domain_values_simple)
+    puzzle = compile_puzzle(csp, index)
+    prefixes = split_subproblems(
+        csp, puzzle, workers * subproblems_per_worker, propagation, value_ordering, split_depth,
+        config.get("tie_break", "degree"), config.get("seed")
+    )
+
+    stats = {"nodes": 0, "backtracks": 0, "subproblems": len(prefixes), "unresolved": 0}
+    combined = {"status": "unsat", "solution": None, "deepest": {}, "stats": stats}
+    for prefix in prefixes:
+        if len(prefix) == len(csp):
+            combined.update(status="solved", solution=prefix, deepest=prefix)
+            return combined
+
+    context = pool_context()
+    stop_event = context.Event()
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(csp, puzzle, stop_event)
+    ) as executor:
+        pending = {executor.submit(_run_subproblem, prefix, config, deadline) for prefix in prefixes}
+        while pending:
+            remaining = None if deadline is None else max(deadline - time.time(), 0.0)
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            if not done:
+                stop_event.set()
+                for other in pending:
+                    other.cancel()
+                stats["unresolved"] += len(pending)
+                combined["status"] = "timeout"
+                return combined
+            for future in done:
+                result = future.result()
+                stats["nodes"] += result["stats"]["nodes"]
+                stats["backtracks"] += result["stats"]["backtracks"]
+                if len(result["deepest"]) > len(combined["deepest"]):
+                    combined["deepest"] = result["deepest"]
+                if result["status"] == "solved":
+                    stop_event.set()
+                    for other in pending:
+                        other.cancel()
+                    combined.update(status="solved", solution=result["solution"])
+                    return combined
+                if result["status"] != "unsat":
+                    stats["unresolved"] += 1
+                    combined["status"] = "timeout"
+    return combined
@@ -0,0 +1,32 @@
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# The modules import each other by their flat names, as when run from src
+sys.path.insert(0, os.path.join(ROOT, "src"))
+
+from crossword import load_words
+
+@pytest.fixture(scope="session")
+def words():
+    return load_words(os.path.join(ROOT, "data", "Words.txt"))
+
+@pytest.fixture
+def check_solution():
+    """
+    Assert that a solution fills every slot with a distinct word of its domain, agreeing on every crossing.
+    """
+    from consistent import get_word_positions
+
+    def check(csp, solution):
+        assert set(solution) == set(csp)
+        assert len(set(solution.values())) == len(solution)
+        cells = {}
+        for var, word in solution.items():
+            assert word in csp[var]["domain"]
+            for position, letter in zip(get_word_positions(var, csp), word):
+                assert cells.setdefault(position, letter) == letter
+
+    return check
@@ -0,0 +1,81 @@
+import random
+
+import numpy as np
+import pytest
+
+from consistent import get_word_positions
+from crossword import define_crossword_small
+from csp import puzzle2csp
+from enumeration import count_solutions, iter_solutions
+
+# A ring of four three-letter slots around a black square
+RING = np.array([
+    [1, 0, 2],
+    [0, -1, 0],
+    [3, 0, 0]
+])
+# The same ring beside a ring of four-letter slots, which can share no word with it
+TWO_RINGS = np.array([
+    [1, 0, 2, -1, 3, 0, 0, 4],
+    [0, -1, 0, -1, 0, -1, -1, 0],
+    [5, 0, 0, -1, 0, -1, -1, 0],
+    [-1, -1, -1, -1, 6, 0, 0, 0]
+])
+
+def brute_force_count(csp):
+    """
+    Count the solutions by trying every word of every slot in turn, with no heuristics.
+    """
+    variables = list(csp)
+    positions = {var: get_word_positions(var, csp) for var in variables}
+
+    def extend(depth, cells, used):
+        if depth == len(variables):
+            return 1
+        var = variables[depth]
+        count = 0
+        for word in csp[var]["domain"]:
+            if word in used:
+                continue
+            if all(cells.get(position, letter) == letter for position, letter in zip(positions[var], word)):
+                filled = dict(cells)
+                filled.update(zip(positions[var], word))
+                count += extend(depth + 1, filled, used | {word})
+        return count
+
+    return extend(0, {}, frozenset())
+
+def sample_by_length(words, seed, sizes):
+    rng = random.Random(seed)
+    return [
+        word
+        for length, size in sizes.items()
+        for word in rng.sample([word for word in words if len(word) == length], size)
+    ]
+
+@pytest.mark.parametrize("seed", range(5))
+def test_count_solutions_matches_brute_force(words, check_solution, seed):
+    csp = puzzle2csp(RING, sample_by_length(words, seed, {3: 60}))
+    expected = brute_force_count(csp)
+    assert expected > 0
+
+    assert count_solutions(csp) == expected
+    solutions = list(iter_solutions(csp))
+    assert len({tuple(sorted(solution.items())) for solution in solutions}) == len(solutions) == expected
+    for solution in solutions:
+        check_solution(csp, solution)
+    assert len(list(iter_solutions(csp, limit=3))) == min(3, expected)
+
+def test_count_solutions_multiplies_independent_regions(words):
+    sample = sample_by_length(words, 0, {3: 40, 4: 80})
+    stats = {}
+    count = count_solutions(puzzle2csp(TWO_RINGS, sample), stats=stats)
+    assert stats["splits"] > 0
+    left = brute_force_count(puzzle2csp(TWO_RINGS[:, :3], sample))
+    right = brute_force_count(puzzle2csp(TWO_RINGS[:, 4:], sample))
+    assert count == left * right > 0
+
+def test_count_solutions_timeout(words):
+    csp = puzzle2csp(define_crossword_small(), words)
+    with pytest.raises(TimeoutError):
+        count_solutions(csp, timeout_s=0)
@@ -0,0 +1,70 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from crossword import define_crossword_heart, define_crossword_large, define_crossword_small
+from loaders import grid_problems, load_grids, read_jsonl, read_text, read_workbook
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_read_workbook_reads_one_grid_per_sheet():
+    records = list(read_workbook(os.path.join(ROOT, "puzzles_matrices.xlsx")))
+    assert [record["id"] for record in records] == ["Puzzle 1 Small", "Puzzle 2 Large", "Puzzle 3 Heart"]
+    for record, define in zip(records, (define_crossword_small, define_crossword_large, define_crossword_heart)):
+        np.testing.assert_array_equal(record["grid"], define())
+
+def test_read_text_parses_tokens_names_and_numbering(tmp_path):
+    path = tmp_path / "grids.txt"
+    path.write_text(
+        "; small\n"
+        "1 . 2\n"
+        "# # .\n"
+        "\n"
+        "1,.,.\n"
+        "\n"
+        "; comment only names the grid it opens\n"
+        "1 . .\n"
+    )
+    records = list(read_text(str(path)))
+    assert [record["id"] for record in records] == ["small", 2, "comment only names the grid it opens"]
+    np.testing.assert_array_equal(records[0]["grid"], [[1, 0, 2], [-1, -1, 0]])
+    np.testing.assert_array_equal(records[1]["grid"], [[1, 0, 0]])
+
+@pytest.mark.parametrize("content", ["1 . x\n", "1 . .\n1 .\n"])
+def test_read_text_rejects_invalid_grids(tmp_path, content):
+    path = tmp_path / "grids.txt"
+    path.write_text(content)
+    with pytest.raises(ValueError):
+        list(read_text(str(path)))
+
+def test_read_jsonl_numbers_records_and_reports_bad_lines(tmp_path):
+    path = tmp_path / "puzzles.jsonl"
+    path.write_text(
+        json.dumps({"grid": [[1, 0, 0]]}) + "\n"
+        "\n"
+        + json.dumps({"id": "named", "grid": [[1, 0, 0]]}) + "\n"
+        "{not json\n"
+        "[1, 2]\n"
+    )
+    records = list(read_jsonl(str(path)))
+    assert [record["id"] for record in records] == [1, "named", 4, 5]
+    assert "status" not in records[0] and "status" not in records[1]
+    assert [record["status"] for record in records[2:]] == ["error", "error"]
+
+def test_load_grids_validates_and_reads_directories(tmp_path):
+    (tmp_path / "a.jsonl").write_text(json.dumps({"id": "open", "grid": [[1, 0, 0], [-1, -1, 0]]}) + "\n")
+    (tmp_path / "b.txt").write_text("1 . .\n")
+    (tmp_path / ".hidden").write_text("not a grid\n")
+    records = list(load_grids(str(tmp_path)))
+    assert [record["id"] for record in records] == ["a.jsonl:open", "b.txt:1"]
+    assert records[0]["problems"] == ["Open cells (1, 2) belong to no slot"]
+    assert records[1]["problems"] == []
+
+def test_grid_problems():
+    assert grid_problems(define_crossword_large()) == []
+    assert grid_problems("x") == ["The grid must be a 2-D array of integers"]
+    problems = grid_problems([[1, 0, 1], [-2, -1, -1]])
+    assert any("below -1" in problem for problem in problems)
+    assert any("used by several cells" in problem for problem in problems)
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+
+from backtracking import backtracking_search, search
+from crossword import define_crossword_large, define_crossword_small
+from csp import puzzle2csp
+from decomposition import decomposed_search
+from local_search import min_conflicts
+from propagation import PROPAGATION_MODES
+from work_splitting import split_search
+
+# Dictionary samples small enough for some grids to be unsatisfiable
+SAMPLE_SIZES = (1500, 3000, 5000)
+
+def sampled_csps(words, count, seed=0):
+    rng = random.Random(seed)
+    return [
+        puzzle2csp(define_crossword_large(), rng.sample(words, SAMPLE_SIZES[i % len(SAMPLE_SIZES)]))
+        for i in range(count)
+    ]
+
+@pytest.mark.parametrize("propagation", PROPAGATION_MODES)
+def test_backtracking_search_solves_the_hand_coded_grids(words, check_solution, propagation):
+    for csp in (puzzle2csp(define_crossword_small(), words, del_list=["2across"]),
+                puzzle2csp(define_crossword_large(), words)):
+        solution = backtracking_search(csp, propagation=propagation)
+        assert solution is not None
+        check_solution(csp, solution)
+
+def test_search_modes_agree(words, check_solution):
+    configs = [
+        {"propagation": propagation, "tie_break": tie_break, "backjumping": backjumping}
+        for propagation in PROPAGATION_MODES
+        for tie_break in ("degree", "wdeg")
+        for backjumping in (False, True)
+        if not (backjumping and propagation == "mac")
+    ]
+    statuses = set()
+    for csp in sampled_csps(words, 6):
+        reference = search(csp, propagation="forward", tie_break="wdeg", timeout_s=30)
+        assert reference["status"] in ("solved", "unsat")
+        statuses.add(reference["status"])
+        results = [search(csp, timeout_s=30, **config) for config in configs]
+        results.append(decomposed_search(csp, timeout_s=30, propagation="forward"))
+        for result in results:
+            assert result["status"] == reference["status"]
+            if result["status"] == "solved":
+                check_solution(csp, result["solution"])
+    # The samples cover both outcomes
+    assert statuses == {"solved", "unsat"}
+
+def test_split_search_agrees_with_search(words, check_solution):
+    for csp in sampled_csps(words, 3, seed=1):
+        expected = search(csp, propagation="forward", tie_break="wdeg", timeout_s=30)["status"]
+        result = split_search(csp, workers=2, timeout_s=30, propagation="forward", tie_break="wdeg")
+        assert result["status"] == expected
+        if result["status"] == "solved":
+            check_solution(csp, result["solution"])
+
+def test_min_conflicts_finds_valid_fills(words, check_solution):
+    csp = puzzle2csp(define_crossword_large(), words)
+    result = min_conflicts(csp, seed=0, timeout_s=30)
+    assert result["status"] == "solved"
+    check_solution(csp, result["solution"])
+
+def test_min_conflicts_reports_empty_domains(words):
+    csp = puzzle2csp(define_crossword_large(), words, prior_knowledge={"5across": ["toolong"]})
+    result = min_conflicts(csp, seed=0)
+    assert result["status"] == "unsat"
+    assert result["solution"] is None
@@ -0,0 +1,114 @@
+import asyncio
+import json
+import os
+import signal
+import socket
+
+import server
+from crossword import define_crossword_heart, define_crossword_large
+from server import SolverServer, request_solve
+
+def raw_request(port, data):
+    """
+    Send raw bytes to the server and return the status code and decoded body.
+    """
+    with socket.create_connection(("127.0.0.1", port), timeout=30) as connection:
+        connection.sendall(data)
+        response = b""
+        try:
+            while chunk := connection.recv(65536):
+                response += chunk
+        except ConnectionResetError:
+            # The server closes without reading oversized requests to the end
+            pass
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body)
+
+def run_with_server(words, scenario, **options):
+    """
+    Start a server on a free loopback port, run ``scenario(server, call)`` and stop it.
+
+    ``call(function, *args)`` runs a blocking client function off the event loop.
+    """
+    async def main():
+        solver_server = SolverServer(words, port=0, workers=2, propagation="forward", **options)
+        await solver_server.start()
+        loop = asyncio.get_running_loop()
+
+        async def call(function, *args):
+            return await loop.run_in_executor(None, function, *args)
+
+        try:
+            return await scenario(solver_server, call)
+        finally:
+            await solver_server.close()
+
+    return asyncio.run(main())
+
+def test_solve_and_error_statuses(words):
+    async def scenario(solver_server, call):
+        port = solver_server.port
+        status, result = await call(request_solve, {"id": "large", "grid": define_crossword_large().tolist()},
+                                    "127.0.0.1", port, 30)
+        assert status == 200
+        assert result["id"] == "large" and result["status"] == "solved"
+
+        status, result = await call(request_solve, {"id": "bad", "grid": "x"}, "127.0.0.1", port, 30)
+        assert status == 400 and result["status"] == "error"
+
+        assert (await call(raw_request, port, b"POST /solve HTTP/1.1\r\nContent-Length: 3\r\n\r\n[1]"))[0] == 400
+        assert (await call(raw_request, port, b"POST /solve HTTP/1.1\r\nContent-Length: 2\r\n\r\n{x"))[0] == 400
+        assert (await call(raw_request, port, b"POST /solve HTTP/1.1\r\nContent-Length: -1\r\n\r\n"))[0] == 400
+        assert (await call(raw_request, port, b"POST /solve HTTP/1.1\r\nContent-Length: x\r\n\r\n"))[0] == 400
+        assert (await call(raw_request, port, b"GET /solve HTTP/1.1\r\n\r\n"))[0] == 405
+        assert (await call(raw_request, port, b"GET /nowhere HTTP/1.1\r\n\r\n"))[0] == 404
+        assert (await call(raw_request, port, b"NONSENSE\r\n\r\n"))[0] == 400
+        header = b"X-Padding: " + b"x" * 200000 + b"\r\n"
+        assert (await call(raw_request, port, b"POST /solve HTTP/1.1\r\n" + header + b"\r\n"))[0] == 413
+
+        status, health = await call(raw_request, port, b"GET /health HTTP/1.1\r\n\r\n")
+        assert status == 200 and health == {"status": "ok", "active": 0, "queued": 0}
+
+    run_with_server(words, scenario)
+
+def test_timed_out_solve_keeps_its_slot(words, monkeypatch):
+    # A negative grace answers 504 at once, while the worker still searches
+    monkeypatch.setattr(server, "GRACE_S", -10.0)
+
+    async def scenario(solver_server, call):
+        record = {"id": "heart", "grid": define_crossword_heart().tolist(), "timeout_s": 1.0}
+        status, _ = await call(request_solve, record, "127.0.0.1", solver_server.port, 30)
+        assert status == 504
+        assert solver_server.active == 1
+        for _ in range(100):
+            if solver_server.active == 0:
+                break
+            await asyncio.sleep(0.05)
+        assert solver_server.active == 0
+
+    run_with_server(words, scenario, max_concurrent=1)
+
+def test_overload_is_refused(words):
+    async def scenario(solver_server, call):
+        record = {"grid": define_crossword_heart().tolist(), "timeout_s": 1.0}
+        results = await asyncio.gather(*(
+            call(request_solve, dict(record, id=i), "127.0.0.1", solver_server.port, 30) for i in range(4)
+        ))
+        statuses = sorted(status for status, _ in results)
+        assert statuses.count(503) == 2
+        assert all(status == 200 for status in statuses if status != 503)
+
+    run_with_server(words, scenario, max_concurrent=1, max_queue=1)
+
+def test_dead_worker_replaces_the_pool(words):
+    async def scenario(solver_server, call):
+        port = solver_server.port
+        for pid in list(solver_server._executor._processes):
+            os.kill(pid, signal.SIGKILL)
+        record = {"id": "large", "grid": define_crossword_large().tolist()}
+        status, _ = await call(request_solve, record, "127.0.0.1", port, 30)
+        assert status == 503
+        status, result = await call(request_solve, record, "127.0.0.1", port, 30)
+        assert status == 200 and result["status"] == "solved"
+
+    run_with_server(words, scenario)
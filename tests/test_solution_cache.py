@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from crossword import define_crossword_large, define_crossword_small
+from solution_cache import SolutionCache, dictionary_fingerprint, puzzle_key
+
+@pytest.fixture
+def cache(tmp_path):
+    with SolutionCache(str(tmp_path / "cache.db")) as solution_cache:
+        yield solution_cache
+
+def test_hits_and_misses(cache):
+    key = puzzle_key(define_crossword_small(), dictionary_fingerprint(["abc"]))
+    assert cache.get(key) is None
+    cache.put(key, "solved", {"1across": "abc"}, {"nodes": 3})
+    assert cache.get(key) == {"status": "solved", "solution": {"1across": "abc"}, "stats": {"nodes": 3}}
+    other = puzzle_key(define_crossword_large(), dictionary_fingerprint(["abc"]))
+    assert cache.get(other) is None
+    cache.put(other, "unsat")
+    assert cache.get(other) == {"status": "unsat", "solution": None, "stats": {}}
+    assert len(cache) == 2
+
+def test_only_conclusive_outcomes_are_cached(cache):
+    with pytest.raises(ValueError):
+        cache.put("key", "timeout")
+    assert len(cache) == 0
+
+def test_entries_persist_across_connections(tmp_path):
+    path = str(tmp_path / "cache.db")
+    with SolutionCache(path) as first:
+        first.put("key", "unsat")
+    with SolutionCache(path) as second:
+        assert second.get("key")["status"] == "unsat"
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    with SolutionCache(str(tmp_path / "cache.db"), max_entries=2) as cache:
+        cache.put("a", "unsat")
+        cache.put("b", "unsat")
+        assert cache.get("a") is not None
+        cache.put("c", "unsat")
+        assert cache.get("b") is None
+        assert cache.get("a") is not None and cache.get("c") is not None
+
+def test_puzzle_key_covers_every_input():
+    grid = define_crossword_small()
+    dictionary = dictionary_fingerprint(["abc", "abd"])
+    key = puzzle_key(grid, dictionary)
+    assert dictionary_fingerprint(["abd", "abc", "abc"]) == dictionary
+    assert puzzle_key(np.array(grid), dictionary) == key
+    assert puzzle_key(grid, dictionary, del_list=["2across", "2across"]) == puzzle_key(grid, dictionary, ["2across"])
+
+    changed = grid.copy()
+    changed[0, 0] = -1
+    assert len({
+        key,
+        puzzle_key(changed, dictionary),
+        puzzle_key(grid, dictionary_fingerprint(["abc"])),
+        puzzle_key(grid, dictionary, del_list=["2across"]),
+        puzzle_key(grid, dictionary, prior_knowledge={"1across": ["jms", "abc"]}),
+        puzzle_key(grid, dictionary, prior_knowledge={"1across": ["abc", "jms"]}),
+        puzzle_key(grid, dictionary, config={"propagation": "forward"}),
+    }) == 7
+
+def test_puzzle_key_rejects_string_prior_knowledge():
+    with pytest.raises(TypeError):
+        puzzle_key(define_crossword_small(), "dictionary", prior_knowledge={"1across": "jms"})